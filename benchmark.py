@@ -0,0 +1,274 @@
+# This script benchmarks the pipe dimension lookups in "python version.py".
+# It measures single lookup latency, batch throughput, streaming CSV throughput
+# and memory, and cold start time, and writes the results as JSON. The suite
+# runs several rounds, and each metric is recorded as the median and
+# interquartile range of its samples. A saved result file can be used as a
+# baseline to flag regressions that are larger than the run-to-run noise.
+#
+# Usage:
+#   python benchmark.py --output results.json
+#   python benchmark.py --compare baseline.json
+
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+CALCULATOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python version.py")
+
+# Loads the calculator inside a child process, so cold start and memory are
+# measured without anything this script has already imported.
+_CHILD_PRELUDE = f"""
+import importlib.util, json, resource, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("pipe_calculator", {CALCULATOR_PATH!r})
+calculator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(calculator)
+imported = time.perf_counter()
+"""
+
+_IMPORT_CHILD = _CHILD_PRELUDE + """
+calculator.get_pipe_dimensions("2", "40")
+first_lookup = time.perf_counter()
+print(json.dumps({"import": imported - start, "first_lookup": first_lookup - imported}))
+"""
+
+_STREAM_CHILD = _CHILD_PRELUDE + """
+import os
+with open(sys.argv[1], newline="") as input_stream, open(os.devnull, "w") as output_stream:
+    started = time.perf_counter()
+    written, rejected = calculator.stream_line_list(input_stream, output_stream, output_stream)
+    elapsed = time.perf_counter() - started
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+scale = 1 if sys.platform == "darwin" else 1024
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+print(json.dumps({"rows": written + rejected, "seconds": elapsed, "peak_rss": peak}))
+"""
+
+
+def load_calculator():
+    """Imports "python version.py", whose name is not a valid module name."""
+    spec = importlib.util.spec_from_file_location("pipe_calculator", CALCULATOR_PATH)
+    calculator = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(calculator)
+    return calculator
+
+
+def _metric(samples, unit, better):
+    """
+    Packs the samples of one measurement; better is 'lower' or 'higher'.
+
+    The value is the median of the samples and iqr their interquartile range,
+    which is how far apart runs of unchanged code typically are.
+    """
+    quartiles = statistics.quantiles(samples, n=4)
+    return {"value": statistics.median(samples), "iqr": quartiles[2] - quartiles[0],
+            "samples": samples, "unit": unit, "better": better}
+
+
+def _time_per_call(statement, number):
+    """Returns the time per call, in seconds, of one timeit run."""
+    return timeit.timeit(statement, number=number) / number
+
+
+def _sample_inputs(calculator, count, seed=0):
+    """Returns count (size, schedule) pairs drawn from the table, as NumPy string arrays."""
+    np = calculator.np
+    keys = list(calculator.PIPE_INDEX)
+    picks = np.random.default_rng(seed).integers(0, len(keys), count)
+    pipe_sizes = np.array([pipe_size for pipe_size, _ in keys])[picks]
+    schedules = np.array([schedule for _, schedule in keys])[picks]
+    return pipe_sizes, schedules
+
+
+def bench_single(calculator):
+    """Measures the latency of one get_pipe_dimensions call for a hit and a miss."""
+    return {
+        "single.hit": (_time_per_call(lambda: calculator.get_pipe_dimensions("2 1/2", "40"), 100000),
+                       "s", "lower"),
+        "single.miss": (_time_per_call(lambda: calculator.get_pipe_dimensions("99", "40"), 100000),
+                        "s", "lower")
+    }
+
+
+def bench_batch(calculator, batches):
+    """Measures get_pipe_dimensions_batch throughput for each prepared batch of inputs."""
+    results = {}
+    for pipe_sizes, schedules in batches:
+        seconds = timeit.timeit(lambda: calculator.get_pipe_dimensions_batch(pipe_sizes, schedules), number=1)
+        results[f"batch.{len(pipe_sizes)}"] = (len(pipe_sizes) / seconds, "rows/s", "higher")
+    return results
+
+
+def _write_stream_line_list(calculator, rows):
+    """Writes the CSV line list for the streaming benchmark and returns its path."""
+    keys = list(calculator.PIPE_INDEX)
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as line_list:
+        writer = csv.writer(line_list)
+        writer.writerow(["line", "size", "schedule"])
+        for row in range(rows):
+            pipe_size, schedule = keys[row % len(keys)]
+            writer.writerow([f"L{row}", pipe_size, schedule])
+    return line_list.name
+
+
+def bench_stream(path):
+    """Measures streaming CSV throughput and peak memory in a child process."""
+    measured = json.loads(subprocess.run(
+        [sys.executable, "-c", _STREAM_CHILD, path], check=True, capture_output=True, text=True
+    ).stdout)
+    return {
+        "stream.csv": (measured["rows"] / measured["seconds"], "rows/s", "higher"),
+        "stream.peak_rss": (measured["peak_rss"], "bytes", "lower")
+    }
+
+
+def bench_cold_start():
+    """Measures module import and first lookup time in a fresh interpreter."""
+    measured = json.loads(subprocess.run(
+        [sys.executable, "-c", _IMPORT_CHILD], check=True, capture_output=True, text=True
+    ).stdout)
+    return {
+        "cold.import": (measured["import"], "s", "lower"),
+        "cold.first_lookup": (measured["first_lookup"], "s", "lower")
+    }
+
+
+def run_benchmarks(max_rows, stream_rows, runs):
+    """
+    Runs every benchmark and returns the results with some environment details.
+
+    The whole suite is run the given number of rounds, each taking one sample
+    of every metric. Spreading the samples over the session, rather than
+    repeating each measurement back to back, lets their spread include the
+    slower drifts of the machine as well.
+    """
+    calculator = load_calculator()
+    batches = []
+    if calculator.np is None:
+        print("NumPy is not installed; skipping the batch benchmarks.", file=sys.stderr)
+    else:
+        rows = 1000
+        while rows <= max_rows:
+            batches.append(_sample_inputs(calculator, rows))
+            rows *= 10
+    line_list = _write_stream_line_list(calculator, stream_rows)
+
+    samples = {}
+    try:
+        for _ in range(runs):
+            for measured in (bench_single(calculator), bench_batch(calculator, batches),
+                             bench_stream(line_list), bench_cold_start()):
+                for name, (value, unit, better) in measured.items():
+                    samples.setdefault(name, (unit, better, []))[2].append(value)
+    finally:
+        os.remove(line_list)
+
+    return {
+        "parameters": {"max_rows": max_rows, "stream_rows": stream_rows, "runs": runs},
+        "python": platform.python_version(),
+        "numpy": getattr(calculator.np, "__version__", None),
+        "machine": platform.machine(),
+        "metrics": {name: _metric(values, unit, better) for name, (unit, better, values) in samples.items()}
+    }
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Compares two result sets and returns the metrics that got worse beyond the noise.
+
+    A metric counts as a regression when its median got worse by more than
+    threshold, and by more than the spread of the samples: the medians must be
+    further apart than the two interquartile ranges added together. A warning
+    is printed for each environment detail (Python, NumPy, machine) that
+    differs from the baseline.
+
+    Returns:
+        list: (name, baseline value, current value, relative change) tuples,
+              where the change is positive when the metric got worse.
+
+    Raises:
+        ValueError: If the results were measured with different parameters
+                    (--max-rows, --stream-rows, --runs), which makes them incomparable.
+    """
+    if baseline.get("parameters") != current["parameters"]:
+        raise ValueError(
+            f"The baseline was measured with parameters {baseline.get('parameters')}, "
+            f"this run with {current['parameters']}; rerun with the same --max-rows, --stream-rows and --runs."
+        )
+    for detail in ("python", "numpy", "machine"):
+        if baseline.get(detail) != current[detail]:
+            print(f"Warning: the baseline was measured with {detail} {baseline.get(detail)}, "
+                  f"this run with {current[detail]}; differences may not come from the code.", file=sys.stderr)
+
+    regressions = []
+    for name, measured in current["metrics"].items():
+        reference = baseline["metrics"].get(name)
+        if reference is None or not reference["value"]:
+            continue
+        difference = measured["value"] - reference["value"]
+        if measured["better"] == "higher":
+            difference = -difference
+        change = difference / reference["value"]
+        if change > threshold and difference > reference["iqr"] + measured["iqr"]:
+            regressions.append((name, reference["value"], measured["value"], change))
+    return regressions
+
+
+def _print_results(results):
+    """Prints the median and interquartile range of each metric as an aligned table."""
+    for name, measured in results["metrics"].items():
+        print(f"{name:<22} {measured['value']:>14.6g} ± {measured['iqr'] / 2:<10.3g} {measured['unit']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipe dimension lookups.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="Compare against a saved JSON result file and fail on regressions.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown of the median counted as a regression, "
+                             "if it is also beyond the run-to-run spread (default: 0.10).")
+    parser.add_argument("--max-rows", type=int, default=10 ** 7,
+                        help="Largest batch size to measure (default: 10000000).")
+    parser.add_argument("--stream-rows", type=int, default=10 ** 6,
+                        help="Rows in the streaming CSV benchmark (default: 1000000).")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Rounds of the suite; each metric is summarised as the median and "
+                             "interquartile range of its samples (default: 5).")
+    args = parser.parse_args(argv)
+    if args.runs < 2:
+        parser.error("--runs must be at least 2 to measure the spread.")
+
+    results = run_benchmarks(args.max_rows, args.stream_rows, args.runs)
+    _print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        try:
+            regressions = compare_results(baseline, results, args.threshold)
+        except ValueError as error:
+            print(f"Cannot compare: {error}", file=sys.stderr)
+            return 2
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before:.6g} -> {after:.6g} ({change:+.1%} worse)")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
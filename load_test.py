@@ -0,0 +1,147 @@
+# This script generates load against the HTTP lookup service of "python version.py"
+# (started with --serve PORT) and reports p50/p99 latency and requests per second.
+# Each simulated client keeps one connection alive and sends its requests in turn.
+#
+# Usage:
+#   python load_test.py --start --port 8080
+#   python load_test.py --port 8080 --connections 16 --requests 50000 --batch 1000
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+from benchmark import CALCULATOR_PATH, load_calculator
+
+
+def _percentile(sorted_values, fraction):
+    """Returns the value below which the given fraction of the sorted values fall."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def build_requests(host, batch_size, count=256):
+    """Returns a cycle of raw HTTP requests, covering every size and schedule in the table."""
+    keys = list(load_calculator().PIPE_INDEX)
+    requests = []
+    for number in range(count):
+        if batch_size:
+            rows = [keys[(number * batch_size + row) % len(keys)] for row in range(batch_size)]
+            body = json.dumps({
+                "size": [pipe_size for pipe_size, _ in rows],
+                "schedule": [schedule for _, schedule in rows]
+            }).encode("utf-8")
+            head = (f"POST /batch HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n")
+            requests.append(head.encode("latin-1") + body)
+        else:
+            pipe_size, schedule = keys[number % len(keys)]
+            requests.append(
+                f"GET /pipe?size={quote(pipe_size)}&schedule={quote(schedule)} HTTP/1.1\r\n"
+                f"Host: {host}\r\n\r\n".encode("latin-1")
+            )
+    return requests
+
+
+async def _read_response(reader):
+    """Reads one response and returns its status code."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    length = 0
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split(" ")[1])
+
+
+async def _client(host, port, requests, start, count, latencies, failures):
+    """Sends count requests over one kept-alive connection, recording each latency."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for number in range(start, start + count):
+            sent = time.perf_counter()
+            writer.write(requests[number % len(requests)])
+            await writer.drain()
+            status = await _read_response(reader)
+            latencies.append(time.perf_counter() - sent)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(host, port, connections, total_requests, batch_size):
+    """Runs the load test and returns the latencies (s), failed statuses, and elapsed time (s)."""
+    requests = build_requests(host, batch_size)
+    latencies, failures = [], []
+    # Spread the requests as evenly as possible; clients with none are not started
+    per_client, extra = divmod(total_requests, connections)
+    counts = [per_client + (client < extra) for client in range(connections)]
+    starts = [sum(counts[:client]) for client in range(connections)]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, requests, start, count, latencies, failures)
+        for start, count in zip(starts, counts) if count
+    ))
+    return latencies, failures, time.perf_counter() - started
+
+
+def _start_server(port):
+    """Starts the service in a child process and waits until it accepts connections."""
+    server = subprocess.Popen([sys.executable, CALCULATOR_PATH, "--serve", str(port)],
+                              stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError(f"The service did not start listening on port {port}.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load against the pipe lookup service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Service address (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8080, help="Service port (default: 8080).")
+    parser.add_argument("--connections", type=int, default=8,
+                        help="Concurrent keep-alive connections (default: 8).")
+    parser.add_argument("--requests", type=int, default=20000,
+                        help="Total number of requests (default: 20000).")
+    parser.add_argument("--batch", type=int, default=0,
+                        help="Rows per POST /batch request; 0 sends GET /pipe lookups (default: 0).")
+    parser.add_argument("--start", action="store_true",
+                        help="Start the service on --port first and stop it afterwards.")
+    args = parser.parse_args(argv)
+    if args.requests < 1 or args.connections < 1:
+        parser.error("--requests and --connections must be at least 1.")
+
+    server = _start_server(args.port) if args.start else None
+    try:
+        latencies, failures, elapsed = asyncio.run(
+            run_load(args.host, args.port, args.connections, args.requests, args.batch)
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    print(f"requests     {len(latencies)} ({len(failures)} failed)")
+    print(f"requests/s   {len(latencies) / elapsed:.0f}")
+    if args.batch:
+        print(f"rows/s       {len(latencies) * args.batch / elapsed:.0f}")
+    print(f"p50 latency  {_percentile(latencies, 0.50) * 1000:.3f} ms")
+    print(f"p99 latency  {_percentile(latencies, 0.99) * 1000:.3f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
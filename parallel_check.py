@@ -0,0 +1,94 @@
+# This script checks that the parallel line list functions of "python version.py"
+# give exactly the serial results. The generated line lists contain quoted fields
+# with embedded newlines, inch marks, blank lines, and rows with extra or missing
+# fields, so shard split points often fall inside a record.
+#
+# Usage:
+#   python parallel_check.py
+#   python parallel_check.py --rows 20000 --workers 2 4 8
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+
+from benchmark import load_calculator
+
+
+def write_line_lists(directory, row_count, keys):
+    """Writes a CSV and a JSONL line list of row_count rows and returns their paths."""
+    csv_path = os.path.join(directory, "line_list.csv")
+    jsonl_path = os.path.join(directory, "line_list.jsonl")
+    with open(csv_path, "w", newline="", encoding="utf-8") as csv_file, \
+            open(jsonl_path, "w", encoding="utf-8") as jsonl_file:
+        csv_file.write("line,size,schedule,length,material,note\r\n")
+        for number in range(row_count):
+            pipe_size, schedule = keys[number % len(keys)]
+            if number % 11 == 0:
+                pipe_size = pipe_size + '"'
+            note = '"multi\nline note"' if number % 7 == 0 else "plain"
+            if number % 13 == 0:
+                csv_file.write(f"L{number},{pipe_size},{schedule}\r\n")
+            elif number % 17 == 0:
+                csv_file.write(f"L{number},{pipe_size},{schedule},{number % 50},CS,{note},extra\r\n")
+            else:
+                quoted_size = '"' + pipe_size.replace('"', '""') + '"'
+                csv_file.write(f"L{number},{quoted_size},{schedule},{number % 50},CS,{note}\r\n")
+            if number % 19 == 0:
+                csv_file.write("\r\n")
+            row = {"line": f"L{number}", "size": pipe_size, "schedule": schedule,
+                   "length": number % 50, "material": "CS", "note": "multi\nline note"}
+            jsonl_file.write(json.dumps(row) + "\n")
+            if number % 23 == 0:
+                jsonl_file.write("{not json\n\n")
+    return csv_path, jsonl_path
+
+
+def _annotate(calculator, path, file_format, workers):
+    """Returns the output, rejects, and counts of one run (serial when workers is 0)."""
+    output_stream, reject_stream = io.StringIO(newline=""), io.StringIO(newline="")
+    if workers:
+        counts = calculator.parallel_stream_line_list(path, output_stream, reject_stream, file_format,
+                                                      chunk_size=100, workers=workers)
+    else:
+        with open(path, newline="", encoding="utf-8") as input_stream:
+            counts = calculator.stream_line_list(input_stream, output_stream, reject_stream, file_format,
+                                                 chunk_size=100)
+    return output_stream.getvalue(), reject_stream.getvalue(), counts
+
+
+def _take_off(calculator, path, file_format, workers):
+    """Returns the take-off result of one run (serial when workers is 0)."""
+    if workers:
+        return calculator.parallel_aggregate_take_off(path, file_format, chunk_size=100, workers=workers)
+    with open(path, newline="", encoding="utf-8") as input_stream:
+        return calculator.aggregate_take_off(calculator.read_line_list(input_stream, file_format), chunk_size=100)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare parallel and serial line list results.")
+    parser.add_argument("--rows", type=int, default=4000, help="Rows per line list (default: 4000).")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8],
+                        help="Worker counts to check (default: 2 4 8).")
+    args = parser.parse_args(argv)
+
+    calculator = load_calculator()
+    # The worker processes look the shard functions up by module name
+    sys.modules[calculator.__name__] = calculator
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_line_lists(directory, args.rows, list(calculator.PIPE_INDEX))
+        for path, file_format in zip(paths, ("csv", "jsonl")):
+            for name, run in (("annotate", _annotate), ("take-off", _take_off)):
+                expected = run(calculator, path, file_format, 0)
+                for workers in args.workers:
+                    matches = run(calculator, path, file_format, workers) == expected
+                    failures += not matches
+                    print(f"{file_format:<6} {name:<9} {workers} workers  {'ok' if matches else 'DIFFERS'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,483 +2,3261 @@
 # and Wall Thickness of pipes based on their nominal size and schedule.
 # The data used for lookup is provided in the problem description.
 
-def get_pipe_dimensions(pipe_size_input, schedule_input):
+import argparse
+import bisect
+import csv
+import io
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+from collections import Counter, namedtuple
+from fractions import Fraction
+from functools import lru_cache
+from itertools import chain, islice
+from time import perf_counter
+from types import MappingProxyType
+from urllib.parse import parse_qs
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the batch lookup functions
+    np = None
+
+# Data structure containing pipe dimensions based on nominal size and schedule.
+# This dictionary is the hand-maintained source; lookups go through PIPE_INDEX below:
+# {
+#   "Pipe Size": {
+#     "OD": <Outer Diameter>,
+#     "schedules": {
+#       ("Schedule1", "Schedule2"): {"ID": <Inner Diameter>, "Wall": <Wall Thickness>},
+#       ...
+#     }
+#   },
+#   ...
+# }
+_PIPE_DATA_SOURCE = {
+    "1/8": {
+        "OD": 0.405,
+        "schedules": {
+            ("10", "10S"): {"ID": 0.307, "Wall": 0.049},
+            ("40", "STD", "40S"): {"ID": 0.269, "Wall": 0.068},
+            ("80", "XS", "80S"): {"ID": 0.215, "Wall": 0.095}
+        }
+    },
+    "1/4": {
+        "OD": 0.54,
+        "schedules": {
+            ("10", "10S"): {"ID": 0.41, "Wall": 0.065},
+            ("40", "STD", "40S"): {"ID": 0.364, "Wall": 0.088},
+            ("80", "XS", "80S"): {"ID": 0.302, "Wall": 0.119}
+        }
+    },
+    "3/8": {
+        "OD": 0.675,
+        "schedules": {
+            ("10", "10S"): {"ID": 0.545, "Wall": 0.065},
+            ("40", "STD", "40S"): {"ID": 0.493, "Wall": 0.091},
+            ("80", "XS", "80S"): {"ID": 0.423, "Wall": 0.126}
+        }
+    },
+    "1/2": {
+        "OD": 0.84,
+        "schedules": {
+            ("5", "5S"): {"ID": 0.71, "Wall": 0.065},
+            ("10", "10S"): {"ID": 0.674, "Wall": 0.083},
+            ("40", "STD", "40S"): {"ID": 0.622, "Wall": 0.109},
+            ("80", "XS", "80S"): {"ID": 0.546, "Wall": 0.147},
+            ("160",): {"ID": 0.466, "Wall": 0.187},
+            ("XX",): {"ID": 0.252, "Wall": 0.294}
+        }
+    },
+    "3/4": {
+        "OD": 1.05,
+        "schedules": {
+            ("5", "5S"): {"ID": 0.92, "Wall": 0.065},
+            ("10", "10S"): {"ID": 0.884, "Wall": 0.083},
+            ("40", "STD", "40S"): {"ID": 0.824, "Wall": 0.113},
+            ("80", "XS", "80S"): {"ID": 0.742, "Wall": 0.154},
+            ("160",): {"ID": 0.614, "Wall": 0.218},
+            ("XX",): {"ID": 0.434, "Wall": 0.308}
+        }
+    },
+    "1": {
+        "OD": 1.315,
+        "schedules": {
+            ("5", "5S"): {"ID": 1.185, "Wall": 0.065},
+            ("10", "10S"): {"ID": 1.097, "Wall": 0.109},
+            ("40", "STD", "40S"): {"ID": 1.049, "Wall": 0.133},
+            ("80", "XS", "80S"): {"ID": 0.957, "Wall": 0.179},
+            ("160",): {"ID": 0.815, "Wall": 0.25},
+            ("XX",): {"ID": 0.599, "Wall": 0.358}
+        }
+    },
+    "1 1/4": {
+        "OD": 1.66,
+        "schedules": {
+            ("5", "5S"): {"ID": 1.53, "Wall": 0.065},
+            ("10", "10S"): {"ID": 1.442, "Wall": 0.109},
+            ("40", "STD", "40S"): {"ID": 1.38, "Wall": 0.14},
+            ("80", "XS", "80S"): {"ID": 1.278, "Wall": 0.191},
+            ("160",): {"ID": 1.16, "Wall": 0.25},
+            ("XX",): {"ID": 0.896, "Wall": 0.382}
+        }
+    },
+    "1 1/2": {
+        "OD": 1.9,
+        "schedules": {
+            ("5", "5S"): {"ID": 1.77, "Wall": 0.065},
+            ("10", "10S"): {"ID": 1.682, "Wall": 0.109},
+            ("40", "STD", "40S"): {"ID": 1.61, "Wall": 0.145},
+            ("80", "XS", "80S"): {"ID": 1.5, "Wall": 0.2},
+            ("160",): {"ID": 1.337, "Wall": 0.281},
+            ("XX",): {"ID": 1.1, "Wall": 0.4}
+        }
+    },
+    "2": {
+        "OD": 2.375,
+        "schedules": {
+            ("5", "5S"): {"ID": 2.225, "Wall": 0.065},
+            ("10", "10S"): {"ID": 2.157, "Wall": 0.109},
+            ("40", "STD", "40S"): {"ID": 2.067, "Wall": 0.154},
+            ("80", "XS", "80S"): {"ID": 1.939, "Wall": 0.218},
+            ("160",): {"ID": 1.687, "Wall": 0.344},
+            ("XX",): {"ID": 1.503, "Wall": 0.436}
+        }
+    },
+    "2 1/2": {
+        "OD": 2.875,
+        "schedules": {
+            ("5", "5S"): {"ID": 2.709, "Wall": 0.083},
+            ("10", "10S"): {"ID": 2.635, "Wall": 0.12},
+            ("40", "STD", "40S"): {"ID": 2.469, "Wall": 0.203},
+            ("80", "XS", "80S"): {"ID": 2.323, "Wall": 0.276},
+            ("160",): {"ID": 2.125, "Wall": 0.375},
+            ("XX",): {"ID": 1.771, "Wall": 0.552}
+        }
+    },
+    "3": {
+        "OD": 3.5,
+        "schedules": {
+            ("5", "5S"): {"ID": 3.334, "Wall": 0.083},
+            ("10", "10S"): {"ID": 3.26, "Wall": 0.12},
+            ("40", "STD", "40S"): {"ID": 3.068, "Wall": 0.216},
+            ("80", "XS", "80S"): {"ID": 2.9, "Wall": 0.3},
+            ("160",): {"ID": 2.624, "Wall": 0.438},
+            ("XX",): {"ID": 2.3, "Wall": 0.6}
+        }
+    },
+    "3 1/2": {
+        "OD": 4.0,
+        "schedules": {
+            ("5", "5S"): {"ID": 3.834, "Wall": 0.083},
+            ("10", "10S"): {"ID": 3.76, "Wall": 0.12},
+            ("40", "STD", "40S"): {"ID": 3.548, "Wall": 0.226},
+            ("80", "XS", "80S"): {"ID": 3.364, "Wall": 0.318},
+            ("XX",): {"ID": 2.728, "Wall": 0.636}
+        }
+    },
+    "4": {
+        "OD": 4.5,
+        "schedules": {
+            ("5", "5S"): {"ID": 4.334, "Wall": 0.083},
+            ("10", "10S"): {"ID": 4.26, "Wall": 0.12},
+            ("40", "STD", "40S"): {"ID": 4.026, "Wall": 0.237},
+            ("80", "XS", "80S"): {"ID": 3.826, "Wall": 0.337},
+            ("120",): {"ID": 3.624, "Wall": 0.438},
+            ("160",): {"ID": 3.438, "Wall": 0.531},
+            ("XX",): {"ID": 3.152, "Wall": 0.674}
+        }
+    },
+    "4 1/2": {
+        "OD": 5.0,
+        "schedules": {
+            ("10", "10S"): {"ID": 4.506, "Wall": 0.247},
+            ("STD", "40S"): {"ID": 4.506, "Wall": 0.247},
+            ("XS", "80S"): {"ID": 4.29, "Wall": 0.355}
+        }
+    },
+    "5": {
+        "OD": 5.563,
+        "schedules": {
+            ("5", "5S"): {"ID": 5.345, "Wall": 0.109},
+            ("10", "10S"): {"ID": 5.295, "Wall": 0.134},
+            ("40", "STD", "40S"): {"ID": 5.047, "Wall": 0.258},
+            ("80", "XS", "80S"): {"ID": 4.813, "Wall": 0.375},
+            ("120",): {"ID": 4.563, "Wall": 0.5},
+            ("160",): {"ID": 4.313, "Wall": 0.625},
+            ("XX",): {"ID": 4.063, "Wall": 0.75}
+        }
+    },
+    "6": {
+        "OD": 6.625,
+        "schedules": {
+            ("5", "5S"): {"ID": 6.407, "Wall": 0.109},
+            ("10", "10S"): {"ID": 6.357, "Wall": 0.134},
+            ("40", "STD", "40S"): {"ID": 6.065, "Wall": 0.28},
+            ("80", "XS", "80S"): {"ID": 5.761, "Wall": 0.432},
+            ("120",): {"ID": 5.501, "Wall": 0.562},
+            ("160",): {"ID": 5.189, "Wall": 0.719},
+            ("XX",): {"ID": 4.897, "Wall": 0.864}
+        }
+    },
+    "7": {
+        "OD": 7.625,
+        "schedules": {
+            ("STD", "40", "40S"): {"ID": 7.005, "Wall": 0.31},
+            ("XS", "80", "80S"): {"ID": 6.625, "Wall": 0.5},
+            ("XX",): {"ID": 5.875, "Wall": 0.875}
+        }    
+    },
+    "8": {
+        "OD": 8.625,
+        "schedules": {
+            ("5S",): {"ID": 8.407, "Wall": 0.109},
+            ("10", "10S"): {"ID": 8.329, "Wall": 0.148},
+            ("20",): {"ID": 8.125, "Wall": 0.25},
+            ("30",): {"ID": 8.071, "Wall": 0.277},
+            ("40", "STD", "40S"): {"ID": 7.981, "Wall": 0.322},
+            ("60",): {"ID": 7.813, "Wall": 0.406},
+            ("80", "XS", "80S"): {"ID": 7.625, "Wall": 0.5},
+            ("100",): {"ID": 7.439, "Wall": 0.594},
+            ("120",): {"ID": 7.189, "Wall": 0.719},
+            ("140",): {"ID": 7.001, "Wall": 0.812},
+            ("160",): {"ID": 6.813, "Wall": 0.906},
+            ("XX",): {"ID": 6.875, "Wall": 0.875}
+        }
+    },
+    "9": {
+        "OD": 9.625,
+        "schedules": {
+            ("STD", "40", "40S"): {"ID": 8.941, "Wall": 0.342},
+            ("XS", "80", "80S"): {"ID": 8.625, "Wall": 0.5},
+            ("XX",): {"ID": 7.875, "Wall": 0.875}
+        }
+    },
+    "10": {
+        "OD": 10.75,
+        "schedules": {
+            ("5S",): {"ID": 10.482, "Wall": 0.134},
+            ("10", "10S"): {"ID": 10.42, "Wall": 0.165},
+            ("20",): {"ID": 10.25, "Wall": 0.25},
+            ("30",): {"ID": 10.136, "Wall": 0.307},
+            ("40", "STD", "40S"): {"ID": 10.02, "Wall": 0.365},
+            ("60", "XS", "80S"): {"ID": 9.75, "Wall": 0.5},
+            ("80",): {"ID": 9.564, "Wall": 0.594},
+            ("100",): {"ID": 9.314, "Wall": 0.719},
+            ("120",): {"ID": 9.064, "Wall": 0.844},
+            ("140", "XX"): {"ID": 8.75, "Wall": 1.0},
+            ("160",): {"ID": 8.5, "Wall": 1.125}
+        }
+    },    
+    "11": {
+        "OD": 11.75,
+        "schedules": {
+            ("STD", "40", "40S"): {"ID": 11.0, "Wall": 0.375},
+            ("XS", "80", "80S"): {"ID": 10.75, "Wall": 0.5},
+            ("XX",): {"ID": 10.0, "Wall": 0.875}
+        }
+    },
+    "12": {
+        "OD": 12.75,
+        "schedules": {
+            ("5S",): {"ID": 12.438, "Wall": 0.156},
+            ("10", "10S"): {"ID": 12.39, "Wall": 0.18},
+            ("20",): {"ID": 12.25, "Wall": 0.25},
+            ("30",): {"ID": 12.09, "Wall": 0.33},
+            ("STD", "40S"): {"ID": 12.0, "Wall": 0.375},
+            ("40",): {"ID": 11.938, "Wall": 0.406},
+            ("XS", "80S"): {"ID": 11.75, "Wall": 0.5},
+            ("60",): {"ID": 11.626, "Wall": 0.562},
+            ("80",): {"ID": 11.376, "Wall": 0.688},
+            ("100",): {"ID": 11.064, "Wall": 0.844},
+            ("120", "XX"): {"ID": 10.75, "Wall": 1.0},
+            ("140",): {"ID": 10.5, "Wall": 1.125},
+            ("160",): {"ID": 10.126, "Wall": 1.312}
+        }
+    },
+    "14": {
+        "OD": 14.0,
+        "schedules": {
+            ("10S",): {"ID": 13.624, "Wall": 0.188},
+            ("10",): {"ID": 13.5, "Wall": 0.25},
+            ("20",): {"ID": 13.375, "Wall": 0.312},
+            ("30", "STD", "40S"): {"ID": 13.25, "Wall": 0.375},
+            ("40",): {"ID": 13.124, "Wall": 0.438},
+            ("XS", "80S"): {"ID": 13.0, "Wall": 0.5},
+            ("60",): {"ID": 12.814, "Wall": 0.594},
+            ("80",): {"ID": 12.5, "Wall": 0.75},
+            ("100",): {"ID": 12.124, "Wall": 0.938},
+            ("120",): {"ID": 11.814, "Wall": 1.09},
+            ("140",): {"ID": 11.5, "Wall": 1.25},
+            ("160",): {"ID": 11.188, "Wall": 1.406}
+        }
+    },
+    "16": {
+        "OD": 16.0,
+        "schedules": {
+            ("10S",): {"ID": 15.624, "Wall": 0.188},
+            ("10",): {"ID": 15.5, "Wall": 0.25},
+            ("20",): {"ID": 15.375, "Wall": 0.312},
+            ("30", "STD", "40S"): {"ID": 15.25, "Wall": 0.375},
+            ("40", "XS", "80S"): {"ID": 15.0, "Wall": 0.5},
+            ("60",): {"ID": 14.688, "Wall": 0.656},
+            ("80",): {"ID": 14.314, "Wall": 0.844},
+            ("100",): {"ID": 13.938, "Wall": 1.031},
+            ("120",): {"ID": 13.564, "Wall": 1.22},
+            ("140",): {"ID": 13.124, "Wall": 1.438},
+            ("160",): {"ID": 12.814, "Wall": 1.594}
+        }
+    },
+    "18": {
+        "OD": 18.0,
+        "schedules": {
+            ("10S",): {"ID": 17.624, "Wall": 0.188},
+            ("10",): {"ID": 17.5, "Wall": 0.25},
+            ("20",): {"ID": 17.375, "Wall": 0.312},
+            ("STD", "40S"): {"ID": 17.25, "Wall": 0.375},
+            ("30",): {"ID": 17.124, "Wall": 0.438},
+            ("XS", "80S"): {"ID": 17.0, "Wall": 0.5},
+            ("40",): {"ID": 16.876, "Wall": 0.562},
+            ("60",): {"ID": 16.5, "Wall": 0.75},
+            ("80",): {"ID": 16.126, "Wall": 0.938},
+            ("100",): {"ID": 15.688, "Wall": 1.156},
+            ("120",): {"ID": 15.25, "Wall": 1.38},
+            ("140",): {"ID": 14.876, "Wall": 1.562},
+            ("160",): {"ID": 14.438, "Wall": 1.781}
+        }
+    },
+    "20": {
+        "OD": 20.0,
+        "schedules": {
+            ("10S",): {"ID": 19.564, "Wall": 0.218},
+            ("10",): {"ID": 19.5, "Wall": 0.25},
+            ("20", "STD", "40S"): {"ID": 19.25, "Wall": 0.375},
+            ("30", "XS", "80S"): {"ID": 19.0, "Wall": 0.5},
+            ("40",): {"ID": 18.812, "Wall": 0.594},
+            ("60",): {"ID": 18.376, "Wall": 0.812},
+            ("80",): {"ID": 17.938, "Wall": 1.031},
+            ("100",): {"ID": 17.438, "Wall": 1.281},
+            ("120",): {"ID": 17.0, "Wall": 1.5},
+            ("140",): {"ID": 16.5, "Wall": 1.75},
+            ("160",): {"ID": 16.064, "Wall": 1.969}
+        }
+        },
+    "22": {
+        "OD": 22.0,
+        "schedules": {
+            ("10", "10S"): {"ID": 21.5, "Wall": 0.25},
+            ("STD", "20", "40S"): {"ID": 21.25, "Wall": 0.375},
+            ("XS", "30", "80S"): {"ID": 21.0, "Wall": 0.5},
+            ("60",): {"ID": 20.25, "Wall": 0.875},
+            ("80",): {"ID": 19.75, "Wall": 1.125},
+            ("100",): {"ID": 19.25, "Wall": 1.375},
+            ("120",): {"ID": 18.749, "Wall": 1.626},
+            ("140",): {"ID": 18.25, "Wall": 1.875},
+            ("160",): {"ID": 17.75, "Wall": 2.125}
+        }
+    },
+    "24": {
+        "OD": 24.0,
+        "schedules": {
+            ("10", "10S"): {"ID": 23.5, "Wall": 0.25},
+            ("20", "STD", "40S"): {"ID": 23.25, "Wall": 0.375},
+            ("XS", "80S"): {"ID": 23.0, "Wall": 0.5},
+            ("30",): {"ID": 22.876, "Wall": 0.562},
+            ("40",): {"ID": 22.626, "Wall": 0.688},
+            ("60",): {"ID": 22.064, "Wall": 0.969},
+            ("80",): {"ID": 21.564, "Wall": 1.219},
+            ("100",): {"ID": 20.938, "Wall": 1.531},
+            ("120",): {"ID": 20.376, "Wall": 1.812},
+            ("140",): {"ID": 19.876, "Wall": 2.062},
+            ("160",): {"ID": 19.314, "Wall": 2.344}
+        }
+    },
+    "26": {
+        "OD": 26.0,
+        "schedules": {
+            ("10",): {"ID": 25.376, "Wall": 0.312},
+            ("STD", "40S"): {"ID": 25.25, "Wall": 0.375},
+            ("XS", "80S"): {"ID": 25.0, "Wall": 0.5}
+        }
+    },
+    "28": {
+        "OD": 28.0,
+        "schedules": {
+            ("10",): {"ID": 27.376, "Wall": 0.312},
+            ("STD", "40S"): {"ID": 27.25, "Wall": 0.375},
+            ("XS", "20", "80S"): {"ID": 27.0, "Wall": 0.5},
+            ("30",): {"ID": 26.75, "Wall": 0.625}
+        }
+    },
+    "30": {
+        "OD": 30.0,
+        "schedules": {
+            ("10", "10S"): {"ID": 29.376, "Wall": 0.312},
+            ("STD", "40S"): {"ID": 29.25, "Wall": 0.375},
+            ("20", "XS", "80S"): {"ID": 29.0, "Wall": 0.5},
+            ("30",): {"ID": 28.75, "Wall": 0.625}
+        }
+    },
+    "32": {
+        "OD": 32.0,
+        "schedules": {
+            ("10",): {"ID": 31.376, "Wall": 0.312},
+            ("20",): {"ID": 31.25, "Wall": 0.375},
+            ("STD",): {"ID": 31.0, "Wall": 0.5}, 
+            ("30",): {"ID": 30.75, "Wall": 0.625},
+            ("40",): {"ID": 30.624, "Wall": 0.688}
+        }
+    },
+    "34": {
+        "OD": 34.0,
+        "schedules": {
+            ("10",): {"ID": 33.376, "Wall": 0.312},
+            ("STD",): {"ID": 33.25, "Wall": 0.375},
+            ("20",): {"ID": 33.0, "Wall": 0.5},
+            ("30",): {"ID": 32.75, "Wall": 0.625},
+            ("40",): {"ID": 32.624, "Wall": 0.688}
+        }
+    },
+    "36": {
+        "OD": 36.0,
+        "schedules": {
+            ("10",): {"ID": 35.376, "Wall": 0.312},
+            ("STD", "40S"): {"ID": 35.25, "Wall": 0.375},
+            ("XS", "80S"): {"ID": 35.0, "Wall": 0.5},
+            ("30",): {"ID": 34.75, "Wall": 0.625}
+        }
+    },
+    "42": {
+        "OD": 42.0,
+        "schedules": {
+            ("STD", "40S"): {"ID": 41.25, "Wall": 0.375},
+            ("XS", "80S"): {"ID": 41.0, "Wall": 0.5},
+            ("30",): {"ID": 40.75, "Wall": 0.625},
+            ("40",): {"ID": 40.5, "Wall": 0.75}
+        }
+    },
+    "48": {
+        "OD": 48.0,
+        "schedules": {
+            ("STD", "40S"): {"ID": 47.25, "Wall": 0.375},
+            ("XS", "80S"): {"ID": 47.0, "Wall": 0.5}
+        }
+    },
+    "54": {
+        "OD": 54.0,
+        "schedules": {
+            ("STD",): {"ID": 53.25, "Wall": 0.375},
+            ("XH",): {"ID": 53.0, "Wall": 0.5}
+        }
+    },
+    "60": {
+        "OD": 60.0,
+        "schedules": {
+            ("STD",): {"ID": 59.25, "Wall": 0.375},
+            ("XH",): {"ID": 59.0, "Wall": 0.5}
+        }
+    }
+}
+
+# Other names used for the schedules in the table. Both the table keys and
+# user input are mapped through this, so e.g. "XH" and "XS" find the same row.
+SCHEDULE_ALIASES = {
+    "STANDARD": "STD",
+    "XH": "XS",
+    "EH": "XS",
+    "XXS": "XX",
+    "XXH": "XX"
+}
+
+# Metric DN designations for each nominal pipe size in the table
+DN_TO_NPS = {
+    6: "1/8", 8: "1/4", 10: "3/8", 15: "1/2", 20: "3/4", 25: "1",
+    32: "1 1/4", 40: "1 1/2", 50: "2", 65: "2 1/2", 80: "3", 90: "3 1/2",
+    100: "4", 115: "4 1/2", 125: "5", 150: "6", 175: "7", 200: "8",
+    225: "9", 250: "10", 275: "11", 300: "12", 350: "14", 400: "16",
+    450: "18", 500: "20", 550: "22", 600: "24", 650: "26", 700: "28",
+    750: "30", 800: "32", 850: "34", 900: "36", 1050: "42", 1200: "48",
+    1350: "54", 1500: "60"
+}
+
+
+# --- Canonicalization of nominal sizes and schedules ---
+
+# Number of distinct raw inputs remembered by each canonicalizer
+CANONICAL_CACHE_SIZE = 4096
+
+_UNICODE_FRACTIONS = {"\u00bc": " 1/4", "\u00bd": " 1/2", "\u00be": " 3/4", "\u215b": " 1/8", "\u215c": " 3/8"}
+_INCH_MARKS_PATTERN = re.compile(r'(?:"|\u2033|\u201d|\'\'|(?:INCH(?:ES)?|IN)\.?$|^NPS)')
+_MIXED_FRACTION_PATTERN = re.compile(r"^(?:(\d+)[\s-]+)?(\d+/\d+)$")
+_DECIMAL_PATTERN = re.compile(r"^(?:\d+\.?\d*|\.\d+)$")
+_METRIC_PATTERN = re.compile(r"^(?:DN\s*(\d+)|(\d+)\s*MM)$")
+_SCHEDULE_PREFIX_PATTERN = re.compile(r"^(?:SCHEDULE|SCH)\.?")
+_SCHEDULE_SEPARATORS_PATTERN = re.compile(r"[\s\-.]+")
+
+
+def _parse_nominal_size(text):
+    """
+    Returns a nominal size in inches as a Fraction, or None if it cannot be parsed.
+
+    Accepts "2", "1/2", "2 1/2", "2-1/2" and decimals such as "2.5".
+    A fraction with a zero denominator, such as "1/0", cannot be parsed.
+    """
+    match = _MIXED_FRACTION_PATTERN.match(text)
+    if match:
+        whole, fraction = match.groups()
+        numerator, denominator = fraction.split("/")
+        if not int(denominator):
+            return None
+        return int(whole or 0) + Fraction(int(numerator), int(denominator))
+    if _DECIMAL_PATTERN.match(text):
+        return Fraction(text)
+    return None
+
+
+def _format_nominal_size(value):
+    """Writes a nominal size Fraction the way the table does, e.g. "1/8", "2", "2 1/2"."""
+    whole, remainder = divmod(value, 1)
+    if not remainder:
+        return str(whole)
+    fraction = f"{remainder.numerator}/{remainder.denominator}"
+    return f"{whole} {fraction}" if whole else fraction
+
+
+def canonical_pipe_size(pipe_size_input):
+    """
+    Converts a nominal pipe size as written in a line list to its canonical form.
+
+    Handles inch marks, "2-1/2", "2 1/2", "2\u00bd", decimals like "2.5", and
+    metric sizes like "DN65" or "65mm". Results are memoized, so repeated
+    inputs cost one cache lookup. Table keys go through the same conversion
+    when a dataset is indexed, so both sides always agree.
+
+    Args:
+        pipe_size_input (str): The nominal pipe size in any of the forms above.
+
+    Returns:
+        str or None: The canonical size (e.g., "2 1/2", or "DN63" for a metric
+                     size with no NPS equivalent), or None if the input cannot
+                     be read as a size (including unhashable values such as lists).
+    """
+    try:
+        return _canonical_pipe_size(pipe_size_input)
+    except TypeError:
+        # The cache cannot hash it, and no list or dict is a pipe size
+        return None
+
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def _canonical_pipe_size(pipe_size_input):
+    """The memoized conversion behind canonical_pipe_size()."""
+    text = str(pipe_size_input).upper()
+    for fraction_char, replacement in _UNICODE_FRACTIONS.items():
+        text = text.replace(fraction_char, replacement)
+    text = _INCH_MARKS_PATTERN.sub(" ", text).strip()
+
+    metric = _METRIC_PATTERN.match(text)
+    if metric:
+        diameter_nominal = int(metric.group(1) or metric.group(2))
+        return DN_TO_NPS.get(diameter_nominal, f"DN{diameter_nominal}")
+
+    value = _parse_nominal_size(text)
+    return _format_nominal_size(value) if value is not None else None
+
+
+def canonical_schedule(schedule_input):
+    """
+    Converts a schedule as written in a line list to its canonical form.
+
+    Handles prefixes and spacing ("Sch 40", "SCH-40S", "Schedule 80") and
+    alternative names ("XH", "XXS"; see SCHEDULE_ALIASES). Results are memoized.
+
+    Args:
+        schedule_input (str): The pipe schedule in any of the forms above.
+
+    Returns:
+        str or None: The canonical schedule (e.g., "40S", "XS"), or None if the
+                     input is empty, None, or unhashable (such as a list).
+    """
+    if schedule_input is None:
+        return None
+    try:
+        return _canonical_schedule(schedule_input)
+    except TypeError:
+        return None
+
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def _canonical_schedule(schedule_input):
+    """The memoized conversion behind canonical_schedule()."""
+    text = _SCHEDULE_SEPARATORS_PATTERN.sub("", str(schedule_input).upper())
+    text = _SCHEDULE_PREFIX_PATTERN.sub("", text)
+    return SCHEDULE_ALIASES.get(text, text) or None
+
+
+def _freeze_pipe_data(pipe_data):
+    """
+    Returns a read-only copy of a nested pipe data dictionary.
+
+    Every level is wrapped in a MappingProxyType so the shared module-level
+    table cannot be modified by callers.
+    """
+    frozen = {}
+    for pipe_size, pipe_size_info in pipe_data.items():
+        schedules = {
+            tuple(schedule_keys): MappingProxyType(dict(dimensions))
+            for schedule_keys, dimensions in pipe_size_info["schedules"].items()
+        }
+        frozen[pipe_size] = MappingProxyType({
+            "OD": pipe_size_info["OD"],
+            "schedules": MappingProxyType(schedules)
+        })
+    return MappingProxyType(frozen)
+
+
+# One shared, immutable record per table row. Being a tuple, it also unpacks
+# as (OD, ID, Wall).
+PipeDimensions = namedtuple("PipeDimensions", ("od", "id", "wall"))
+PipeDimensions.__doc__ = "Outer diameter, inner diameter, and wall thickness of a pipe, in inches."
+
+
+class PipeNotFoundError(LookupError):
+    """Raised by lookup_pipe() when the table has no data for a size and schedule."""
+
+    def __init__(self, pipe_size, schedule):
+        super().__init__(pipe_size, schedule)
+        self.pipe_size = pipe_size
+        self.schedule = schedule
+
+    def __str__(self):
+        # Only formatted when someone actually reads the message
+        return f"No data found for Pipe Size: '{self.pipe_size}' and Schedule: '{self.schedule}'."
+
+
+def _build_pipe_index(pipe_data):
+    """
+    Flattens the nested pipe data into a single (size, schedule) lookup.
+
+    Each schedule alias in a schedule tuple gets its own key, so finding a pipe
+    is one dictionary probe instead of a scan over every schedule tuple.
+    Sizes and schedules are stored in canonical form (see canonical_pipe_size()
+    and canonical_schedule()), so they match canonicalized user input.
+
+    Returns:
+        MappingProxyType: Maps (pipe size, schedule) to a PipeDimensions record.
+                          All aliases of a row share the same record.
+    """
+    index = {}
+    for pipe_size, pipe_size_info in pipe_data.items():
+        size_key = canonical_pipe_size(pipe_size) or pipe_size
+        od = pipe_size_info["OD"]
+        for schedule_keys, dimensions in pipe_size_info["schedules"].items():
+            record = PipeDimensions(od, dimensions["ID"], dimensions["Wall"])
+            for schedule in schedule_keys:
+                # Keep the first match, as the original tuple scan did
+                index.setdefault((size_key, canonical_schedule(schedule)), record)
+    return MappingProxyType(index)
+
+
+# The table and its index are built once at import time and shared by every lookup.
+PIPE_DATA = _freeze_pipe_data(_PIPE_DATA_SOURCE)
+PIPE_INDEX = _build_pipe_index(PIPE_DATA)
+
+
+# --- Metric units ---
+
+MM_PER_INCH = 25.4
+UNITS = ("in", "mm")
+
+NPS_TO_DN = MappingProxyType({pipe_size: dn for dn, pipe_size in DN_TO_NPS.items()})
+
+
+def _to_millimetres(inches):
+    """Converts inches to millimetres, rounded to drop floating point noise."""
+    return round(inches * MM_PER_INCH, 4)
+
+
+def _build_metric_index(pipe_index):
+    """
+    Returns a copy of a pipe index with every record converted to millimetres.
+
+    Records that were shared in the inch index stay shared in the metric one.
+    """
+    converted = {}
+    metric_index = {}
+    for key, record in pipe_index.items():
+        metric_record = converted.get(record)
+        if metric_record is None:
+            metric_record = converted[record] = PipeDimensions(*map(_to_millimetres, record))
+        metric_index[key] = metric_record
+    return MappingProxyType(metric_index)
+
+
+def nominal_diameter(pipe_size_input):
+    """
+    Returns the metric DN designation of a nominal pipe size (e.g., "2 1/2" -> 65).
+
+    Returns:
+        int or None: The DN number, or None if the size has no DN equivalent.
+    """
+    return NPS_TO_DN.get(canonical_pipe_size(pipe_size_input))
+
+
+# The metric columns are built together with the table, not per lookup
+PIPE_INDEX_MM = _build_metric_index(PIPE_INDEX)
+
+
+# --- Dimension datasets ---
+
+DEFAULT_DATASET = "ASME B36.10/B36.19"
+
+_STAINLESS_SCHEDULE_PATTERN = re.compile(r"^\d+S$")
+
+
+def _select_schedules(pipe_data, keep):
+    """
+    Returns a copy of nested pipe data with only the schedules for which
+    keep(schedule) is true. Rows and sizes left without schedules are dropped.
+    """
+    selected = {}
+    for pipe_size, pipe_size_info in pipe_data.items():
+        schedules = {}
+        for schedule_keys, dimensions in pipe_size_info["schedules"].items():
+            kept = tuple(schedule for schedule in schedule_keys if keep(schedule))
+            if kept:
+                schedules[kept] = dimensions
+        if schedules:
+            selected[pipe_size] = {"OD": pipe_size_info["OD"], "schedules": schedules}
+    return selected
+
+
+# Functions returning the nested data of each dataset. They are only called
+# the first time a dataset is used.
+_DATASET_SOURCES = {
+    DEFAULT_DATASET: lambda: _PIPE_DATA_SOURCE,
+    # Carbon steel schedules only (5, 10, 40, STD, XS, XX, ...)
+    "ASME B36.10": lambda: _select_schedules(
+        _PIPE_DATA_SOURCE, lambda schedule: not _STAINLESS_SCHEDULE_PATTERN.match(schedule)
+    ),
+    # Stainless steel "S" schedules only (5S, 10S, 40S, 80S)
+    "ASME B36.19": lambda: _select_schedules(
+        _PIPE_DATA_SOURCE, lambda schedule: bool(_STAINLESS_SCHEDULE_PATTERN.match(schedule))
+    )
+}
+
+# Datasets that have been parsed and indexed, by name. The default dataset is
+# the module-level table, which is already built.
+_COMPILED_DATASETS = {
+    DEFAULT_DATASET: {"data": PIPE_DATA, "index": PIPE_INDEX, "index_mm": PIPE_INDEX_MM}
+}
+
+
+def register_dataset(name, source):
+    """
+    Adds a dimension dataset, such as a table for HDPE or copper tube.
+
+    Nothing is parsed until the dataset is first used, so registering a
+    dataset that a job never looks at costs nothing.
+
+    Args:
+        name (str): The name to select the dataset by.
+        source (dict, callable, or path): Nested pipe data in the same layout
+                                          as PIPE_DATA, a function with no
+                                          arguments that returns it (e.g., one
+                                          that reads a file), or the path of a
+                                          binary table file written by
+                                          export_pipe_table(), which is
+                                          memory-mapped instead of parsed.
+
+    Raises:
+        ValueError: If name is the default dataset, which cannot be replaced.
+
+    Example:
+        register_dataset("HDPE SDR11", lambda: load_my_hdpe_table("hdpe.json"))
+        register_dataset("Extended", "extended.pipetbl")
+    """
+    if name == DEFAULT_DATASET:
+        raise ValueError(f"The default dataset '{DEFAULT_DATASET}' cannot be replaced.")
+    if callable(source) or isinstance(source, (str, os.PathLike)):
+        _DATASET_SOURCES[name] = source
+    else:
+        _DATASET_SOURCES[name] = lambda: source
+    # Drop any index built from an earlier source with the same name
+    _COMPILED_DATASETS.pop(name, None)
+
+
+def list_datasets():
+    """Returns the names of all registered datasets."""
+    return sorted(_DATASET_SOURCES)
+
+
+def _get_compiled_dataset(name=None):
+    """Returns the internal cache entry of a dataset, parsing and indexing it on first use."""
+    if name is None:
+        name = DEFAULT_DATASET
+    compiled = _COMPILED_DATASETS.get(name)
+    if compiled is None:
+        if name not in _DATASET_SOURCES:
+            raise ValueError(f"Unknown dataset: '{name}'. Use one of {', '.join(list_datasets())}.")
+        source = _DATASET_SOURCES[name]
+        if isinstance(source, (str, os.PathLike)):
+            compiled = _COMPILED_DATASETS[name] = _compile_table_file(source)
+        else:
+            data = _freeze_pipe_data(source())
+            index = _build_pipe_index(data)
+            compiled = _COMPILED_DATASETS[name] = {
+                "data": data, "index": index, "index_mm": _build_metric_index(index)
+            }
+    return compiled
+
+
+def get_dataset(name=None):
+    """
+    Returns a dataset's read-only nested 'data', its flat (size, schedule)
+    'index', and the same index in millimetres, 'index_mm'.
+
+    Args:
+        name (str, optional): The dataset name. Defaults to DEFAULT_DATASET.
+
+    Raises:
+        ValueError: If no dataset with that name is registered.
+    """
+    compiled = _get_compiled_dataset(name)
+    return MappingProxyType({key: compiled[key] for key in ("data", "index", "index_mm")})
+
+
+# --- Lookup instrumentation ---
+
+LOOKUP_PATHS = ("single", "batch", "stream")
+MISS_REASONS = ("unparseable input", "unknown size", "schedule not offered")
+
+# Upper bounds (seconds) of the latency histogram buckets. A batch call or a
+# streamed chunk counts as one observation.
+LATENCY_BUCKETS = (
+    1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5,
+    1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0
+)
+
+# Most distinct missed inputs kept before the rarest ones are dropped
+_MAX_TRACKED_MISSES = 10000
+
+
+class LookupStats:
+    """
+    Hit/miss counters, missed inputs, and latency histograms for each lookup path.
+
+    An instance is only created by enable_lookup_stats(); while none exists the
+    lookups skip all of this.
+    """
+
+    def __init__(self, top_misses=20):
+        self.top_misses = top_misses
+        self.results = {path: dict.fromkeys(("hit",) + MISS_REASONS, 0) for path in LOOKUP_PATHS}
+        self.missed_inputs = Counter()
+        self.latency_counts = {path: [0] * (len(LATENCY_BUCKETS) + 1) for path in LOOKUP_PATHS}
+        self.latency_sums = dict.fromkeys(LOOKUP_PATHS, 0.0)
+        self._lock = threading.Lock()
+
+    def record(self, path, seconds, hits, misses=()):
+        """
+        Adds the outcome of one call.
+
+        Args:
+            path (str): One of LOOKUP_PATHS.
+            seconds (float): How long the call took.
+            hits (int): The number of pipes found.
+            misses (iterable): (raw size, raw schedule, reason, count) tuples.
+        """
+        with self._lock:
+            results = self.results[path]
+            results["hit"] += hits
+            for pipe_size, schedule, reason, count in misses:
+                results[reason] += count
+                self.missed_inputs[(pipe_size, schedule)] += count
+            if len(self.missed_inputs) > _MAX_TRACKED_MISSES:
+                self.missed_inputs = Counter(dict(self.missed_inputs.most_common(_MAX_TRACKED_MISSES // 2)))
+            self.latency_counts[path][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.latency_sums[path] += seconds
+
+    def merge(self, other):
+        """Adds the statistics collected by another instance, e.g. in a worker process."""
+        with self._lock:
+            for path in LOOKUP_PATHS:
+                for result, count in other.results[path].items():
+                    self.results[path][result] += count
+                for bucket, count in enumerate(other.latency_counts[path]):
+                    self.latency_counts[path][bucket] += count
+                self.latency_sums[path] += other.latency_sums[path]
+            self.missed_inputs.update(other.missed_inputs)
+            if len(self.missed_inputs) > _MAX_TRACKED_MISSES:
+                self.missed_inputs = Counter(dict(self.missed_inputs.most_common(_MAX_TRACKED_MISSES // 2)))
+
+    def __getstate__(self):
+        # Locks cannot be pickled; a worker's statistics are sent back without it
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def to_dict(self):
+        """Returns the collected statistics as JSON-compatible data."""
+        with self._lock:
+            latency = {}
+            for path in LOOKUP_PATHS:
+                cumulative, buckets = 0, {}
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.latency_counts[path]):
+                    cumulative += count
+                    buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+                latency[path] = {"buckets": buckets, "sum": self.latency_sums[path], "count": cumulative}
+            return {
+                "lookups": {path: dict(results) for path, results in self.results.items()},
+                "top_misses": [
+                    {"size": pipe_size, "schedule": schedule, "count": count}
+                    for (pipe_size, schedule), count in self.missed_inputs.most_common(self.top_misses)
+                ],
+                "latency_seconds": latency
+            }
+
+    def to_prometheus(self):
+        """Returns the collected statistics in the Prometheus text exposition format."""
+        data = self.to_dict()
+        lines = [
+            "# HELP pipe_lookups_total Pipe dimension lookups by path and result.",
+            "# TYPE pipe_lookups_total counter"
+        ]
+        for path, results in data["lookups"].items():
+            for result, count in results.items():
+                lines.append(f'pipe_lookups_total{{path="{path}",result="{result}"}} {count}')
+
+        lines += [
+            "# HELP pipe_lookup_top_misses Most frequent inputs with no data.",
+            "# TYPE pipe_lookup_top_misses gauge"
+        ]
+        for miss in data["top_misses"]:
+            size_label, schedule_label = (
+                str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                for value in (miss["size"], miss["schedule"])
+            )
+            lines.append(f'pipe_lookup_top_misses{{size="{size_label}",schedule="{schedule_label}"}} {miss["count"]}')
+
+        lines += [
+            "# HELP pipe_lookup_seconds Time per lookup call (a whole batch or streamed chunk counts once).",
+            "# TYPE pipe_lookup_seconds histogram"
+        ]
+        for path, histogram in data["latency_seconds"].items():
+            for bound, count in histogram["buckets"].items():
+                lines.append(f'pipe_lookup_seconds_bucket{{path="{path}",le="{bound}"}} {count}')
+            lines.append(f'pipe_lookup_seconds_sum{{path="{path}"}} {histogram["sum"]}')
+            lines.append(f'pipe_lookup_seconds_count{{path="{path}"}} {histogram["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+# The active statistics, or None while instrumentation is disabled
+_lookup_stats = None
+
+
+def enable_lookup_stats(top_misses=20):
+    """
+    Starts collecting lookup statistics, discarding any collected before.
+
+    Args:
+        top_misses (int): How many of the most frequent missed inputs to report.
+
+    Returns:
+        LookupStats: The new statistics object.
+    """
+    global _lookup_stats
+    _lookup_stats = LookupStats(top_misses)
+    return _lookup_stats
+
+
+def disable_lookup_stats():
+    """Stops collecting lookup statistics and returns what was collected (or None)."""
+    global _lookup_stats
+    stats, _lookup_stats = _lookup_stats, None
+    return stats
+
+
+def dump_lookup_stats(output_format="json"):
+    """
+    Returns the current lookup statistics as text.
+
+    Args:
+        output_format (str): "json" or "prometheus".
+
+    Raises:
+        ValueError: If instrumentation is disabled or the format is unknown.
+    """
+    if _lookup_stats is None:
+        raise ValueError("Lookup statistics are disabled. Call enable_lookup_stats() first.")
+    if output_format == "json":
+        return json.dumps(_lookup_stats.to_dict(), indent=2)
+    if output_format == "prometheus":
+        return _lookup_stats.to_prometheus()
+    raise ValueError(f"Unknown statistics format: '{output_format}'. Use 'json' or 'prometheus'.")
+
+
+def _miss_reason(pipe_size_input, schedule_input, dataset=None):
+    """Works out why a (size, schedule) pair was not found; one of MISS_REASONS."""
+    pipe_size, schedule = canonical_pipe_size(pipe_size_input), canonical_schedule(schedule_input)
+    if pipe_size is None or schedule is None:
+        return "unparseable input"
+    compiled = _get_compiled_dataset(dataset)
+    sizes = compiled.get("sizes")
+    if sizes is None:
+        sizes = compiled["sizes"] = frozenset(size for (size, _) in compiled["index"])
+    return "schedule not offered" if pipe_size in sizes else "unknown size"
+
+
+def _hashable_input(value):
+    """Returns a raw input as it is counted in the missed inputs; unhashable values are counted as text."""
+    try:
+        hash(value)
+    except TypeError:
+        return str(value)
+    return value
+
+
+def _record_misses(stats, path, seconds, hits, missed_pairs, dataset=None):
+    """Records a call whose missed (raw size, raw schedule) pairs are given as a list."""
+    missed_pairs = Counter(
+        (_hashable_input(pipe_size), _hashable_input(schedule)) for pipe_size, schedule in missed_pairs
+    )
+    misses = [
+        (pipe_size, schedule, _miss_reason(pipe_size, schedule, dataset), count)
+        for (pipe_size, schedule), count in missed_pairs.items()
+    ]
+    stats.record(path, seconds, hits, misses)
+
+
+# --- Single lookup ---
+
+def _get_pipe_index(dataset, units):
+    """Returns the flat index of a dataset in the given units ("in" or "mm")."""
+    if dataset is None and units == "in":
+        return PIPE_INDEX
+    if units not in UNITS:
+        raise ValueError(f"Unknown units: '{units}'. Use one of {', '.join(UNITS)}.")
+    return _get_compiled_dataset(dataset)["index" if units == "in" else "index_mm"]
+
+
+# Tells lookup_pipe() to raise when no default is given
+_RAISE = object()
+
+
+def lookup_pipe(pipe_size_input, schedule_input, dataset=None, default=_RAISE, units="in"):
+    """
+    Returns the shared PipeDimensions record for a nominal size and schedule.
+
+    Records are created once when the table is indexed, so a hit allocates
+    nothing. A miss either returns 'default' or raises PipeNotFoundError,
+    without formatting any message.
+
+    Args:
+        pipe_size_input (str): The nominal pipe size (e.g., "1/8", "2 1/2", "DN65").
+                               See canonical_pipe_size() for the accepted forms.
+        schedule_input (str): The pipe schedule (e.g., "40", "STD", "XS", "Sch 160").
+        dataset (str, optional): The dataset to search (see list_datasets()).
+                                 Defaults to the combined B36.10/B36.19 table.
+        default (optional): Returned when there is no data, instead of raising.
+        units (str): "in" or "mm". Both are precomputed, so neither converts per call.
+
+    Returns:
+        PipeDimensions: The (od, id, wall) record in the chosen units, or default on a miss.
+
+    Raises:
+        PipeNotFoundError: If there is no data and no default was given.
+        ValueError: If the units are unknown.
+    """
+    stats = _lookup_stats
+    if stats is not None:
+        started = perf_counter()
+
+    # Canonicalize the inputs so they match the keys of the data structure
+    normalized_pipe_size = canonical_pipe_size(pipe_size_input)
+    normalized_schedule = canonical_schedule(schedule_input)
+
+    # Look up the (size, schedule) pair in the prebuilt index
+    pipe_index = _get_pipe_index(dataset, units)
+    record = pipe_index.get((normalized_pipe_size, normalized_schedule))
+    if stats is not None:
+        if record is not None:
+            stats.record("single", perf_counter() - started, 1)
+        else:
+            _record_misses(stats, "single", perf_counter() - started, 0,
+                           [(pipe_size_input, schedule_input)], dataset)
+
+    if record is not None:
+        return record
+    if default is _RAISE:
+        raise PipeNotFoundError(pipe_size_input, schedule_input)
+    return default
+
+
+def get_pipe_dimensions(pipe_size_input, schedule_input, dataset=None, units="in"):
+    """
+    Retrieves the OD, ID, and Wall Thickness for a given pipe nominal size and schedule.
+
+    This is the original dictionary/string interface, kept for compatibility.
+    New code should use lookup_pipe(), which returns shared records and does
+    not build a message for every miss.
+
+    Args:
+        pipe_size_input (str): The nominal pipe size (e.g., "1/8", "1", "2 1/2").
+                                The input can include '"' (e.g., "1/8\"") but it will be removed.
+                                See canonical_pipe_size() for the other accepted forms.
+        schedule_input (str): The pipe schedule (e.g., "40", "STD", "XS", "160").
+        dataset (str, optional): The dataset to search (see list_datasets()).
+                                 Defaults to the combined B36.10/B36.19 table.
+        units (str): "in" (default) or "mm".
+
+    Returns:
+        dict or str: A dictionary containing 'OD', 'ID', and 'Wall' if a match is found,
+                     otherwise a string indicating that the data was not found.
+    """
+    record = lookup_pipe(pipe_size_input, schedule_input, dataset, default=None, units=units)
+    if record is not None:
+        return {
+            "OD": record.od,
+            "ID": record.id,
+            "Wall Thickness": record.wall
+        }
+
+    # If no match is found in the index
+    return f"No data found for Pipe Size: '{pipe_size_input}' and Schedule: '{schedule_input}'."
+
+
+# --- Batch lookup (requires NumPy) ---
+
+def _require_numpy():
+    """Raises an ImportError with a clear message when NumPy is not installed."""
+    if np is None:
+        raise ImportError("NumPy is required for batch lookups. Install it with 'pip install numpy'.")
+
+
+def _get_table_arrays(dataset=None):
+    """Returns the dense lookup arrays of a dataset, building them on first use."""
+    _require_numpy()
+    compiled = _get_compiled_dataset(dataset)
+    arrays = compiled.get("arrays")
+    if arrays is None:
+        arrays = compiled["arrays"] = _build_table_arrays(compiled["index"], compiled["index_mm"])
+    return arrays
+
+
+def _build_table_arrays(pipe_index, metric_index):
+    """
+    Encodes a pipe index as integer size/schedule codes and dense lookup arrays.
+
+    Sizes and schedules are numbered in table order. The ID, Wall, and found
+    arrays have one extra row and column that is always "not found", so unknown
+    inputs can be mapped to that code and still go through the same indexing.
+
+    Returns:
+        dict: 'size_codes' and 'schedule_codes' (name -> int), 'DN' (per size,
+              0 where there is no DN), 'found' (size x schedule), and, under
+              "in" and "mm", the 'OD' (per size), 'ID' and 'Wall Thickness'
+              (size x schedule) arrays in those units.
+    """
+    size_codes, schedule_codes = {}, {}
+    for (pipe_size, schedule) in pipe_index:
+        size_codes.setdefault(pipe_size, len(size_codes))
+        schedule_codes.setdefault(schedule, len(schedule_codes))
+
+    shape = (len(size_codes) + 1, len(schedule_codes) + 1)
+    found = np.zeros(shape, dtype=bool)
+    diameter_nominal = np.zeros(shape[0], dtype=np.int64)
+    for pipe_size, row in size_codes.items():
+        diameter_nominal[row] = NPS_TO_DN.get(pipe_size, 0)
+
+    columns = {}
+    for units, index in (("in", pipe_index), ("mm", metric_index)):
+        od = np.full(shape[0], np.nan)
+        inner_diameter = np.full(shape, np.nan)
+        wall = np.full(shape, np.nan)
+        for (pipe_size, schedule), (record_od, record_id, record_wall) in index.items():
+            row, column = size_codes[pipe_size], schedule_codes[schedule]
+            od[row] = record_od
+            inner_diameter[row, column] = record_id
+            wall[row, column] = record_wall
+            found[row, column] = True
+        for array in (od, inner_diameter, wall):
+            array.flags.writeable = False
+        columns[units] = {"OD": od, "ID": inner_diameter, "Wall Thickness": wall}
+
+    found.flags.writeable = False
+    diameter_nominal.flags.writeable = False
+
+    return {
+        "size_codes": MappingProxyType(size_codes),
+        "schedule_codes": MappingProxyType(schedule_codes),
+        "DN": diameter_nominal,
+        "found": found,
+        **columns
+    }
+
+
+def _encode_values(values, codes, normalize):
+    """
+    Converts a sequence of raw strings into integer codes.
+
+    Only the distinct values are normalized and looked up in Python; the codes
+    are then spread back over the full input with one fancy-indexing step.
+    Values that are not in 'codes' get the "not found" code len(codes).
+    """
+    values = np.asarray(values, dtype=str).ravel()
+    unique_values, inverse = np.unique(values, return_inverse=True)
+    missing_code = len(codes)
+    unique_codes = np.fromiter(
+        (codes.get(normalize(value), missing_code) for value in unique_values.tolist()),
+        dtype=np.intp,
+        count=len(unique_values)
+    )
+    return unique_codes[inverse.ravel()]
+
+
+def _encode_pipes(pipe_sizes, schedules, tables):
+    """Returns the size and schedule code arrays of a batch, checking that their lengths match."""
+    size_codes = _encode_values(pipe_sizes, tables["size_codes"], canonical_pipe_size)
+    schedule_codes = _encode_values(schedules, tables["schedule_codes"], canonical_schedule)
+    if size_codes.shape != schedule_codes.shape:
+        raise ValueError(
+            f"pipe_sizes and schedules must have the same length "
+            f"({size_codes.size} != {schedule_codes.size})."
+        )
+    return size_codes, schedule_codes
+
+
+def get_pipe_dimensions_batch(pipe_sizes, schedules, dataset=None, units="in"):
+    """
+    Retrieves the OD, ID, and Wall Thickness for many pipes at once.
+
+    Args:
+        pipe_sizes (sequence or numpy.ndarray): Nominal pipe sizes (e.g., "1/8", "2 1/2").
+        schedules (sequence or numpy.ndarray): Pipe schedules, one per pipe size.
+        dataset (str, optional): The dataset to search. Defaults to DEFAULT_DATASET.
+        units (str): "in" (default) or "mm". With "mm" the result also has a
+                     'DN' int64 array (0 where no data was found).
+
+    Returns:
+        dict: 'OD', 'ID' and 'Wall Thickness' float64 arrays (NaN where no data was found)
+              and a boolean 'found' array, each with one entry per input pipe.
+
+    Raises:
+        ValueError: If pipe_sizes and schedules have different lengths, or the
+                    units are unknown.
+        ImportError: If NumPy is not installed.
+    """
+    return _lookup_batch(pipe_sizes, schedules, dataset, "batch", units)
+
+
+def _lookup_batch(pipe_sizes, schedules, dataset, path, units="in"):
+    """Runs a batch lookup, recording it under the given instrumentation path."""
+    if units not in UNITS:
+        raise ValueError(f"Unknown units: '{units}'. Use one of {', '.join(UNITS)}.")
+    stats = _lookup_stats
+    if stats is not None:
+        started = perf_counter()
+
+    tables = _get_table_arrays(dataset)
+    pipe_sizes = np.asarray(pipe_sizes, dtype=str).ravel()
+    schedules = np.asarray(schedules, dtype=str).ravel()
+    size_codes, schedule_codes = _encode_pipes(pipe_sizes, schedules, tables)
+
+    found = tables["found"][size_codes, schedule_codes]
+    columns = tables[units]
+    # OD only depends on the size, so hide it where the schedule is unknown
+    od = np.where(found, columns["OD"][size_codes], np.nan)
+
+    if stats is not None:
+        missed = ~found
+        _record_misses(stats, path, perf_counter() - started, int(found.sum()),
+                       zip(pipe_sizes[missed].tolist(), schedules[missed].tolist()), dataset)
+
+    result = {
+        "OD": od,
+        "ID": columns["ID"][size_codes, schedule_codes],
+        "Wall Thickness": columns["Wall Thickness"][size_codes, schedule_codes],
+        "found": found
+    }
+    if units == "mm":
+        result["DN"] = np.where(found, tables["DN"][size_codes], 0)
+    return result
+
+
+# --- Reverse lookup and range queries ---
+
+RANGE_COLUMNS = ("OD", "ID", "Wall Thickness", "Flow Area")
+
+
+def _iter_pipe_rows(pipe_data):
+    """
+    Yields one read-only record per row of the pipe data.
+
+    A record holds the size, its canonical schedule names, the dimensions,
+    and the internal flow area in square inches.
+    """
+    for pipe_size, pipe_size_info in pipe_data.items():
+        od = pipe_size_info["OD"]
+        for schedule_keys, dimensions in pipe_size_info["schedules"].items():
+            schedules = tuple(dict.fromkeys(SCHEDULE_ALIASES.get(key, key) for key in schedule_keys))
+            yield MappingProxyType({
+                "Pipe Size": pipe_size,
+                "Schedules": schedules,
+                "OD": od,
+                "ID": dimensions["ID"],
+                "Wall Thickness": dimensions["Wall"],
+                "Flow Area": math.pi / 4 * dimensions["ID"] ** 2
+            })
+
+
+@lru_cache(maxsize=None)
+def _get_range_indexes():
+    """
+    Builds two sorted indexes per column in RANGE_COLUMNS.
+
+    Each index is a (sorted keys, records in the same order) pair, so a range
+    query is two bisections followed by a slice. The keys of the first index
+    are the column values; those of the second are (OD, value) pairs, so a
+    query restricted to one OD bisects within that OD's records only.
+
+    Returns:
+        tuple: (indexes by column, (OD, value) indexes by column)
+    """
+    rows = list(_iter_pipe_rows(PIPE_DATA))
+    indexes, od_indexes = {}, {}
+    for column in RANGE_COLUMNS:
+        ordered = sorted(rows, key=lambda row: row[column])
+        indexes[column] = (tuple(row[column] for row in ordered), tuple(ordered))
+        ordered = sorted(rows, key=lambda row: (row["OD"], row[column]))
+        od_indexes[column] = (tuple((row["OD"], row[column]) for row in ordered), tuple(ordered))
+    return MappingProxyType(indexes), MappingProxyType(od_indexes)
+
+
+def find_pipes(column, minimum=None, maximum=None, od=None):
+    """
+    Finds every size/schedule whose dimension falls within a range.
+
+    The search uses a sorted index over the column, so it takes O(log n + k)
+    time for k matches instead of a scan over the whole table.
+
+    Args:
+        column (str): One of "OD", "ID", "Wall Thickness", or "Flow Area" (in^2).
+        minimum (float, optional): The smallest value to include. No lower bound if None.
+        maximum (float, optional): The largest value to include. No upper bound if None.
+        od (float, optional): Only return pipes with exactly this outer diameter.
+
+    Returns:
+        list: Read-only records with 'Pipe Size', 'Schedules', 'OD', 'ID',
+              'Wall Thickness', and 'Flow Area', ordered by the column.
+
+    Raises:
+        ValueError: If the column is not one of RANGE_COLUMNS.
+
+    Example:
+        find_pipes("ID", 5.9, 6.1) returns the pipes with an ID between 5.9 and 6.1 in.
+    """
+    if column not in RANGE_COLUMNS:
+        raise ValueError(f"Unknown column: '{column}'. Use one of {', '.join(RANGE_COLUMNS)}.")
+
+    indexes, od_indexes = _get_range_indexes()
+    if od is not None:
+        keys, rows = od_indexes[column]
+        start = bisect.bisect_left(keys, (od, -math.inf if minimum is None else minimum))
+        end = bisect.bisect_right(keys, (od, math.inf if maximum is None else maximum))
+        return list(rows[start:end])
+
+    values, rows = indexes[column]
+    start = 0 if minimum is None else bisect.bisect_left(values, minimum)
+    end = len(values) if maximum is None else bisect.bisect_right(values, maximum)
+    return list(rows[start:end])
+
+
+# --- Hydraulics (requires NumPy) ---
+
+INCH_TO_METER = 0.0254
+
+# Default fluid and pipe properties: water at 20 C in commercial steel pipe
+WATER_DENSITY = 998.2           # kg/m^3
+WATER_VISCOSITY = 1.002e-3      # Pa*s
+STEEL_ROUGHNESS = 4.57e-5       # m
+
+LAMINAR_REYNOLDS_LIMIT = 2300.0
+
+
+def friction_factor(reynolds, relative_roughness, iterations=3):
+    """
+    Calculates the Darcy friction factor for arrays of flow conditions.
+
+    Laminar flow (Re < 2300) uses 64/Re. Otherwise the Swamee-Jain
+    approximation is used as the starting point for a fixed number of
+    Colebrook-White iterations, so every element does the same amount of work
+    and there is no per-element loop. Zero flow gives a friction factor of 0.
+
+    Args:
+        reynolds (array-like): Reynolds numbers.
+        relative_roughness (array-like): Roughness divided by inner diameter.
+        iterations (int): Colebrook-White iterations after the Swamee-Jain
+                          start (0 returns the Swamee-Jain value).
+
+    Returns:
+        numpy.ndarray: The Darcy friction factors.
+    """
+    _require_numpy()
+    reynolds, relative_roughness = np.broadcast_arrays(
+        np.asarray(reynolds, dtype=np.float64), np.asarray(relative_roughness, dtype=np.float64)
+    )
+    # Pipes with no flow are set to 0 at the end; NaN keeps them out of the maths
+    safe_reynolds = np.where(reynolds > 0, reynolds, np.nan)
+
+    # Both formulas are evaluated everywhere and the unused one is discarded,
+    # so invalid values in the discarded branch are expected
+    with np.errstate(invalid="ignore", divide="ignore"):
+        turbulent = 0.25 / np.log10(relative_roughness / 3.7 + 5.74 / safe_reynolds ** 0.9) ** 2
+        inverse_sqrt = 1.0 / np.sqrt(turbulent)
+        for _ in range(iterations):
+            inverse_sqrt = -2.0 * np.log10(relative_roughness / 3.7 + 2.51 * inverse_sqrt / safe_reynolds)
+        turbulent = 1.0 / inverse_sqrt ** 2
+
+    laminar = 64.0 / safe_reynolds
+    factor = np.where(safe_reynolds < LAMINAR_REYNOLDS_LIMIT, laminar, turbulent)
+    return np.where(reynolds == 0, 0.0, factor)
+
+
+def _darcy_weisbach(inner_diameters, flow_rates, lengths, density, viscosity, roughness,
+                    colebrook_iterations):
+    """
+    Runs the pressure drop calculation for inner diameters given in metres.
+
+    All arguments broadcast against each other. Returns the same dictionary
+    as calculate_hydraulics(), without the pipe dimension columns. Velocity
+    and pressure drop carry the sign of the flow rate.
+    """
+    inner_diameters, flow_rates, lengths, density, viscosity, roughness = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64)
+          for value in (inner_diameters, flow_rates, lengths, density, viscosity, roughness))
+    )
+    flow_area = np.pi / 4 * inner_diameters ** 2
+    velocity = flow_rates / flow_area
+    reynolds = density * np.abs(velocity) * inner_diameters / viscosity
+    factor = friction_factor(reynolds, roughness / inner_diameters, colebrook_iterations)
+    # v|v| rather than v^2, so a reverse flow gives a pressure drop in the reverse direction
+    pressure_drop = factor * lengths / inner_diameters * density * velocity * np.abs(velocity) / 2
+    return {
+        "Flow Area": flow_area,
+        "Velocity": velocity,
+        "Reynolds Number": reynolds,
+        "Friction Factor": factor,
+        "Pressure Drop": pressure_drop
+    }
+
+
+def calculate_hydraulics(pipe_sizes, schedules, flow_rates, lengths, density=WATER_DENSITY,
+                         viscosity=WATER_VISCOSITY, roughness=STEEL_ROUGHNESS,
+                         colebrook_iterations=3, dataset=None):
+    """
+    Calculates velocity and Darcy-Weisbach pressure drop for every segment of a network.
+
+    The inner diameter of each segment comes from the pipe table through
+    get_pipe_dimensions_batch(). Everything else is calculated with array
+    operations, so networks of hundreds of thousands of segments are handled
+    without a Python loop. Flow rates, lengths, and fluid properties may be
+    arrays (one value per segment) or single values shared by every segment.
+
+    Args:
+        pipe_sizes (sequence or numpy.ndarray): Nominal pipe sizes.
+        schedules (sequence or numpy.ndarray): Pipe schedules.
+        flow_rates (array-like): Volumetric flow rates in m^3/s. A negative
+                                 rate is a flow against the segment's direction.
+        lengths (array-like): Segment lengths in m.
+        density (array-like): Fluid density in kg/m^3 (default: water at 20 C).
+        viscosity (array-like): Dynamic viscosity in Pa*s (default: water at 20 C).
+        roughness (array-like): Absolute pipe roughness in m (default: commercial steel).
+        colebrook_iterations (int): Colebrook-White iterations for the friction factor.
+        dataset (str, optional): The dataset to take inner diameters from.
+
+    Returns:
+        dict: Arrays with one entry per segment: 'ID' (m), 'Flow Area' (m^2),
+              'Velocity' (m/s), 'Reynolds Number', 'Friction Factor',
+              'Pressure Drop' (Pa), and the boolean 'found' mask. Segments whose
+              size and schedule are not in the table get NaN results.
+              Velocity and pressure drop are signed like the flow rate: the
+              pressure drop is the inlet pressure minus the outlet pressure
+              in the segment's direction, so it is negative for reverse flow.
+    """
+    dimensions = get_pipe_dimensions_batch(pipe_sizes, schedules, dataset)
+    inner_diameters = dimensions["ID"] * INCH_TO_METER
+    results = _darcy_weisbach(inner_diameters, flow_rates, lengths, density, viscosity,
+                              roughness, colebrook_iterations)
+    return {"ID": inner_diameters, **results, "found": dimensions["found"]}
+
+
+# --- Line sizing (requires NumPy) ---
+
+HUNDRED_FEET = 30.48  # m
+
+
+@lru_cache(maxsize=None)
+def _get_sizing_tables():
+    """
+    Builds, for every schedule, the sizes offered in that schedule in
+    ascending nominal size order, with their inner diameters (m) and
+    internal flow areas (m^2) as NumPy arrays.
+
+    Within a schedule the inner diameter grows with the nominal size, so both
+    arrays are sorted and can be searched with bisection.
+    """
+    _require_numpy()
+    by_schedule = {}
+    for (pipe_size, schedule) in PIPE_INDEX:
+        by_schedule.setdefault(schedule, []).append(pipe_size)
+
+    tables = {}
+    for schedule, pipe_sizes in by_schedule.items():
+        pipe_sizes.sort(key=lambda pipe_size: _parse_nominal_size(pipe_size))
+        inner_diameters = np.array(
+            [PIPE_INDEX[(pipe_size, schedule)][1] for pipe_size in pipe_sizes]
+        ) * INCH_TO_METER
+        inner_diameters.flags.writeable = False
+        flow_areas = np.pi / 4 * inner_diameters ** 2
+        flow_areas.flags.writeable = False
+        tables[schedule] = (tuple(pipe_sizes), inner_diameters, flow_areas)
+    return MappingProxyType(tables)
+
+
+def _smallest_size_index(flow_rates, inner_diameters, flow_areas, max_velocity, max_pressure_drop,
+                         density, viscosity, roughness):
+    """
+    Returns, for each flow rate, the index of the smallest adequate size in
+    one schedule's sizing table, or len(inner_diameters) if none is adequate.
+
+    The velocity limit becomes a minimum flow area found with searchsorted.
+    The pressure drop limit is found with a vectorized bisection: every
+    step evaluates Darcy-Weisbach once for all lines, so the cost is
+    O(log n) array passes however many sizes the schedule has.
+    """
+    count = len(inner_diameters)
+    index = np.zeros(len(flow_rates), dtype=np.intp)
+
+    if max_velocity is not None:
+        minimum_area = np.abs(flow_rates) / max_velocity
+        index = np.searchsorted(flow_areas, minimum_area, side="left")
+
+    if max_pressure_drop is not None and count:
+        low = index.copy()
+        high = np.full_like(index, count)
+        while np.any(low < high):
+            active = low < high
+            middle = np.minimum((low + high) // 2, count - 1)
+            pressure_drop = _darcy_weisbach(
+                inner_diameters[middle], flow_rates, HUNDRED_FEET, density, viscosity, roughness, 3
+            )["Pressure Drop"]
+            adequate = np.abs(pressure_drop) <= max_pressure_drop
+            high = np.where(active & adequate, middle, high)
+            low = np.where(active & ~adequate, middle + 1, low)
+        index = low
+
+    return index
+
+
+def size_lines(flow_rates, schedules="40", max_velocity=None, max_pressure_drop=None,
+               density=WATER_DENSITY, viscosity=WATER_VISCOSITY, roughness=STEEL_ROUGHNESS):
+    """
+    Picks the smallest nominal size that meets the velocity and pressure drop
+    limits for many lines at once.
+
+    Args:
+        flow_rates (array-like): Design flow rates in m^3/s.
+        schedules (str or sequence): The required schedule, either one for all
+                                     lines or one per line (e.g., "40", "STD", "10S").
+        max_velocity (float, optional): The largest allowed velocity in m/s.
+        max_pressure_drop (float, optional): The largest allowed pressure drop
+                                             in Pa per 100 ft (30.48 m) of pipe.
+        density (float): Fluid density in kg/m^3 (default: water at 20 C).
+        viscosity (float): Dynamic viscosity in Pa*s (default: water at 20 C).
+        roughness (float): Absolute pipe roughness in m (default: commercial steel).
+
+    Returns:
+        dict: One entry per line: 'Pipe Size' and 'Schedule' (None where no size
+              in the schedule meets the limits), 'OD', 'ID', 'Wall Thickness'
+              (in), 'Velocity' (m/s), 'Pressure Drop' (Pa per 100 ft), and the
+              boolean 'found' mask. The limits apply to the magnitudes; velocity
+              and pressure drop keep the sign of the flow rate.
+    """
+    tables = _get_sizing_tables()
+    flow_rates = np.atleast_1d(np.asarray(flow_rates, dtype=np.float64))
+    schedules = np.broadcast_to(np.asarray(schedules, dtype=str), flow_rates.shape)
+
+    pipe_sizes = np.full(flow_rates.shape, None, dtype=object)
+    canonical_schedules = np.full(flow_rates.shape, None, dtype=object)
+    found = np.zeros(flow_rates.shape, dtype=bool)
+    # Lines are grouped by schedule; a line list only uses a handful of them
+    for raw_schedule in np.unique(schedules).tolist():
+        schedule = canonical_schedule(raw_schedule)
+        if schedule not in tables:
+            continue
+        lines = schedules == raw_schedule
+        sizes_in_schedule, inner_diameters, flow_areas = tables[schedule]
+        index = _smallest_size_index(
+            flow_rates[lines], inner_diameters, flow_areas, max_velocity, max_pressure_drop,
+            density, viscosity, roughness
+        )
+        fits = index < len(sizes_in_schedule)
+        chosen = np.array(sizes_in_schedule + (None,), dtype=object)[index]
+        pipe_sizes[lines] = chosen
+        canonical_schedules[lines] = np.where(fits, schedule, None)
+        found[lines] = fits
+
+    dimensions = get_pipe_dimensions_batch(
+        np.where(found, pipe_sizes, "").astype(str), np.where(found, canonical_schedules, "").astype(str)
+    )
+    hydraulics = _darcy_weisbach(
+        dimensions["ID"] * INCH_TO_METER, flow_rates, HUNDRED_FEET, density, viscosity, roughness, 3
+    )
+    return {
+        "Pipe Size": pipe_sizes,
+        "Schedule": canonical_schedules,
+        "OD": dimensions["OD"],
+        "ID": dimensions["ID"],
+        "Wall Thickness": dimensions["Wall Thickness"],
+        "Velocity": hydraulics["Velocity"],
+        "Pressure Drop": hydraulics["Pressure Drop"],
+        "found": found
+    }
+
+
+def size_line(flow_rate, schedule="40", max_velocity=None, max_pressure_drop=None,
+              density=WATER_DENSITY, viscosity=WATER_VISCOSITY, roughness=STEEL_ROUGHNESS):
+    """
+    Picks the smallest nominal size for one line. See size_lines() for the arguments.
+
+    Returns:
+        dict or None: 'Pipe Size', 'Schedule', 'OD', 'ID', 'Wall Thickness',
+                      'Velocity', and 'Pressure Drop' for the chosen pipe, or
+                      None if no size in the schedule meets the limits.
+    """
+    result = size_lines([flow_rate], schedule, max_velocity, max_pressure_drop,
+                        density, viscosity, roughness)
+    if not result["found"][0]:
+        return None
+    return {key: values[0].item() if hasattr(values[0], "item") else values[0]
+            for key, values in result.items() if key != "found"}
+
+
+# --- Material take-off (requires NumPy) ---
+
+# Material densities in lb/in^3
+MATERIAL_DENSITIES = MappingProxyType({
+    "carbon steel": 0.2836,
+    "stainless steel": 0.2890,
+    "duplex stainless steel": 0.2820,
+    "aluminum": 0.0975,
+    "copper": 0.3230
+})
+
+# Short names found in line lists for the materials above
+MATERIAL_ALIASES = {
+    "cs": "carbon steel",
+    "ss": "stainless steel",
+    "dss": "duplex stainless steel",
+    "al": "aluminum",
+    "aluminium": "aluminum",
+    "cu": "copper"
+}
+
+DEFAULT_MATERIAL = "carbon steel"
+CUBIC_INCHES_PER_GALLON = 231.0
+
+# Quantities summed per group by aggregate_take_off(), in this order
+TAKE_OFF_TOTALS = ("Segments", "Length", "Weight", "Internal Volume", "Surface Area")
+
+
+def canonical_material(material_input):
+    """Returns the MATERIAL_DENSITIES name of a material (e.g., "CS" -> "carbon steel")."""
+    material = " ".join(str(material_input).lower().split())
+    return MATERIAL_ALIASES.get(material, material)
+
+
+def _take_off_per_foot(od, inner_diameter, wall, density):
+    """
+    Returns the weight (lb), internal volume (US gal), and external surface
+    area (ft^2) of one foot of pipe, from dimensions in inches and density in lb/in^3.
+    """
+    weight = np.pi * (od - wall) * wall * 12.0 * density
+    volume = np.pi / 4 * inner_diameter ** 2 * 12.0 / CUBIC_INCHES_PER_GALLON
+    area = np.pi * od / 12.0
+    return weight, volume, area
+
+
+def _material_densities(materials, count):
+    """Returns the density of each material as an array (NaN for unknown materials)."""
+    materials = np.broadcast_to(np.asarray(materials, dtype=str), (count,))
+    unique_materials, inverse = np.unique(materials, return_inverse=True)
+    unique_densities = np.array(
+        [MATERIAL_DENSITIES.get(canonical_material(material), np.nan)
+         for material in unique_materials.tolist()],
+        dtype=np.float64
+    )
+    return unique_densities[inverse.ravel()]
+
+
+def calculate_take_off(pipe_sizes, schedules, lengths, materials=DEFAULT_MATERIAL, dataset=None):
+    """
+    Calculates weight, internal volume, and surface area for every segment of a line list.
+
+    Args:
+        pipe_sizes (sequence or numpy.ndarray): Nominal pipe sizes.
+        schedules (sequence or numpy.ndarray): Pipe schedules.
+        lengths (array-like): Segment lengths in ft.
+        materials (str or sequence): One material for all segments or one per
+                                     segment (see MATERIAL_DENSITIES and MATERIAL_ALIASES).
+        dataset (str, optional): The dataset to take dimensions from.
+
+    Returns:
+        dict: Arrays with one entry per segment: 'Weight per Foot' (lb/ft),
+              'Weight' (lb), 'Internal Volume' (US gal, e.g. hydrotest water),
+              'Surface Area' (ft^2, e.g. paint or insulation), and 'found',
+              which is False (and the quantities NaN) where the pipe or the
+              material is unknown.
+    """
+    dimensions = get_pipe_dimensions_batch(pipe_sizes, schedules, dataset)
+    count = len(dimensions["found"])
+    lengths = np.broadcast_to(np.asarray(lengths, dtype=np.float64), (count,))
+    density = _material_densities(materials, count)
+    weight, volume, area = _take_off_per_foot(
+        dimensions["OD"], dimensions["ID"], dimensions["Wall Thickness"], density
+    )
+    return {
+        "Weight per Foot": weight,
+        "Weight": weight * lengths,
+        "Internal Volume": volume * lengths,
+        "Surface Area": area * lengths,
+        "found": dimensions["found"] & ~np.isnan(density)
+    }
+
+
+def _to_float(value):
+    """Converts a line list value to a float, or NaN if it is not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def aggregate_take_off(rows, size_column="size", schedule_column="schedule", length_column="length",
+                       material_column="material", chunk_size=10000, dataset=None):
+    """
+    Sums take-off quantities by size, schedule, and material over a line list.
+
+    Rows are processed 'chunk_size' at a time. Each row gets an integer group
+    code, and segment counts and lengths are added up with numpy.bincount into
+    fixed-size arrays, so memory stays constant however long the line list is.
+    Lengths are summed exactly (to 1e-6 ft), so the result does not depend on
+    how the rows are chunked or split between processes.
+
+    Args:
+        rows (iterable of dict): Line list rows, e.g. from read_line_list().
+        size_column, schedule_column, length_column, material_column (str):
+            The keys holding the nominal size, schedule, length (ft), and
+            material. Rows without a material are counted as DEFAULT_MATERIAL.
+        chunk_size (int): The number of rows processed together.
+        dataset (str, optional): The dataset to take dimensions from.
+
+    Returns:
+        dict: 'groups', a list with one dictionary per size/schedule/material
+              ('Pipe Size', 'Schedule', 'Material', and the TAKE_OFF_TOTALS:
+              segment count, length in ft, weight in lb, internal volume in
+              US gal, and surface area in ft^2), 'totals' over all groups, and
+              'rejected', the number of rows with an unknown pipe or material
+              or a missing length.
+    """
+    tables = _get_table_arrays(dataset)
+    counts, length_units, rejected = _accumulate_take_off(
+        rows, tables, size_column, schedule_column, length_column, material_column, chunk_size
+    )
+    return _summarize_take_off(counts, length_units, rejected, tables)
+
+
+# Lengths are summed as whole micro-feet in integers, so the totals are exact
+# and do not depend on the order (or the process) rows are added in.
+_LENGTH_UNITS_PER_FOOT = 1000000
+
+
+def _take_off_group_counts(tables):
+    """Returns (schedules per size, size/schedule pairs, groups) for a dataset's lookup arrays."""
+    schedule_count = len(tables["schedule_codes"]) + 1
+    pair_count = (len(tables["size_codes"]) + 1) * schedule_count
+    return schedule_count, pair_count, len(MATERIAL_DENSITIES) * pair_count
+
+
+def _accumulate_take_off(rows, tables, size_column, schedule_column, length_column,
+                         material_column, chunk_size):
+    """
+    Counts segments and sums lengths per size/schedule/material group.
+
+    Returns:
+        tuple: (segment counts, lengths in micro-feet, rejected row count), the
+               first two as int64 arrays indexed by group code.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+
+    schedule_count, pair_count, group_count = _take_off_group_counts(tables)
+    material_codes = {material: code for code, material in enumerate(MATERIAL_DENSITIES)}
+    counts = np.zeros(group_count, dtype=np.int64)
+    length_units = np.zeros(group_count, dtype=np.int64)
+    rejected = 0
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        # A MalformedRow has no pipe, so it is counted as rejected
+        records = [row if isinstance(row, dict) else {} for row in chunk]
+        pipe_sizes = np.array([str(row.get(size_column) or "") for row in records])
+        schedules = np.array([str(row.get(schedule_column) or "") for row in records])
+        lengths = np.array([_to_float(row.get(length_column)) for row in records])
+        materials = [str(row.get(material_column) or DEFAULT_MATERIAL) for row in records]
+
+        size_codes, schedule_codes = _encode_pipes(pipe_sizes, schedules, tables)
+        material_index = _encode_values(materials, material_codes, canonical_material)
+        valid = (tables["found"][size_codes, schedule_codes]
+                 & (material_index < len(material_codes))
+                 & np.isfinite(lengths))
+        rejected += len(chunk) - int(valid.sum())
+
+        groups = (material_index[valid] * pair_count
+                  + size_codes[valid] * schedule_count
+                  + schedule_codes[valid])
+        counts += np.bincount(groups, minlength=group_count)
+        np.add.at(length_units, groups, np.rint(lengths[valid] * _LENGTH_UNITS_PER_FOOT).astype(np.int64))
+
+    return counts, length_units, rejected
+
+
+def _summarize_take_off(counts, length_units, rejected, tables):
+    """
+    Turns per-group segment counts and lengths into the aggregate_take_off() result.
+
+    The weight, volume, and area of a group are its per-foot values times its
+    total length, since every segment in a group has the same dimensions.
+    """
+    schedule_count, pair_count, _ = _take_off_group_counts(tables)
+    material_names = list(MATERIAL_DENSITIES)
+    size_names = list(tables["size_codes"])
+    schedule_names = list(tables["schedule_codes"])
+
+    groups = np.flatnonzero(counts)
+    material_codes, pairs = np.divmod(groups, pair_count)
+    size_codes, schedule_codes = np.divmod(pairs, schedule_count)
+    columns = tables["in"]
+    densities = np.array([MATERIAL_DENSITIES[material] for material in material_names])
+    weight, volume, area = _take_off_per_foot(
+        columns["OD"][size_codes],
+        columns["ID"][size_codes, schedule_codes],
+        columns["Wall Thickness"][size_codes, schedule_codes],
+        densities[material_codes]
+    )
+    lengths = length_units[groups] / _LENGTH_UNITS_PER_FOOT
+    quantities = (counts[groups], lengths, weight * lengths, volume * lengths, area * lengths)
+
+    results = []
+    for position, (material_code, size_code, schedule_code) in enumerate(
+            zip(material_codes.tolist(), size_codes.tolist(), schedule_codes.tolist())):
+        result = {
+            "Pipe Size": size_names[size_code],
+            "Schedule": schedule_names[schedule_code],
+            "Material": material_names[material_code]
+        }
+        result.update(zip(TAKE_OFF_TOTALS, (column[position].item() for column in quantities)))
+        results.append(result)
+
+    totals = dict(zip(TAKE_OFF_TOTALS, (column.sum().item() for column in quantities)))
+    return {"groups": results, "totals": totals, "rejected": rejected}
+
+
+# --- ASME B31.3 pressure design (requires NumPy) ---
+
+MILL_TOLERANCE = 0.125
+
+# Limits of the straight pipe formula (B31.3 304.1.2): beyond t = D/6 or
+# P/SE = 0.385 the code requires special consideration instead
+THICK_WALL_RATIO = 1 / 6
+MAX_PRESSURE_STRESS_RATIO = 0.385
+
+# Spacing between sizes in the combined wall array; larger than any wall in inches
+_WALL_KEY_SPACING = 100.0
+
+
+def required_wall_thickness(pressures, outside_diameters, allowable_stresses, quality_factor=1.0,
+                            weld_factor=1.0, y_coefficient=0.4):
+    """
+    Calculates the ASME B31.3 pressure design thickness t = PD / (2(SEW + PY)).
+
+    All arguments broadcast against each other. The formula applies when t is
+    less than D/6; thicker walls need the special considerations of the code.
+
+    Args:
+        pressures (array-like): Internal design gauge pressure P, in psi.
+        outside_diameters (array-like): Outside diameter D, in inches.
+        allowable_stresses (array-like): Allowable stress S at the design temperature, in psi.
+        quality_factor (array-like): Longitudinal weld joint or casting quality factor E.
+        weld_factor (array-like): Weld joint strength reduction factor W.
+        y_coefficient (array-like): Coefficient Y (0.4 for most steels below 900 F).
+
+    Returns:
+        numpy.ndarray: The pressure design thickness t, in inches.
+    """
+    _require_numpy()
+    pressures = np.asarray(pressures, dtype=np.float64)
+    return pressures * outside_diameters / (
+        2 * (np.asarray(allowable_stresses, dtype=np.float64) * quality_factor * weld_factor
+             + pressures * y_coefficient)
+    )
+
+
+def _get_wall_tables(dataset=None):
+    """
+    Returns the walls of every size, sorted ascending, in one array.
+
+    Each size's walls are stored as size_code * _WALL_KEY_SPACING + wall, so a
+    single searchsorted finds the lightest adequate wall for pipes of many
+    different sizes at once. Built once per dataset on first use.
+
+    Returns:
+        dict: 'keys' (the sorted array), 'ends' (one past the last entry of
+              each size code), 'walls', and 'schedules' (a tuple of schedule
+              names for each entry), with a NaN/None entry at the end.
+    """
+    compiled = _get_compiled_dataset(dataset)
+    wall_tables = compiled.get("walls")
+    if wall_tables is not None:
+        return wall_tables
+
+    tables = _get_table_arrays(dataset)
+    size_codes = tables["size_codes"]
+    # Group the schedule names of each distinct row, per size
+    rows_by_size = {}
+    for (pipe_size, schedule), record in compiled["index"].items():
+        rows_by_size.setdefault(size_codes[pipe_size], {}).setdefault(record, []).append(schedule)
+
+    keys, walls, schedules = [], [], []
+    ends = np.zeros(len(size_codes) + 1, dtype=np.intp)
+    for size_code in range(len(size_codes) + 1):
+        rows = sorted(rows_by_size.get(size_code, {}).items(), key=lambda item: item[0].wall)
+        for record, names in rows:
+            keys.append(size_code * _WALL_KEY_SPACING + record.wall)
+            walls.append(record.wall)
+            schedules.append(tuple(names))
+        ends[size_code] = len(keys)
+
+    # A last entry for lines without an adequate schedule, like the not-found row of the batch tables
+    schedule_names = np.empty(len(schedules) + 1, dtype=object)
+    schedule_names[:-1] = schedules
+    wall_tables = compiled["walls"] = {
+        "keys": np.array(keys, dtype=np.float64),
+        "ends": ends,
+        "walls": np.array(walls + [np.nan]),
+        "schedules": schedule_names
+    }
+    for array in wall_tables.values():
+        array.flags.writeable = False
+    return wall_tables
+
+
+def select_minimum_schedule(pipe_sizes, pressures, allowable_stresses, corrosion_allowance=0.0,
+                            mill_tolerance=MILL_TOLERANCE, quality_factor=1.0, weld_factor=1.0,
+                            y_coefficient=0.4, dataset=None):
+    """
+    Picks the lightest schedule whose wall meets the B31.3 pressure design thickness.
+
+    The required nominal wall is (t + corrosion allowance) / (1 - mill tolerance),
+    with t from required_wall_thickness() using the table OD. The lightest
+    adequate wall of each size is then found with one searchsorted over the
+    precomputed, ascending wall arrays, so whole line lists are checked at once.
+
+    Lines where the formula does not apply (t >= D/6 or P/SE > 0.385) are
+    never reported as found, since they need a design beyond this check.
+
+    Args:
+        pipe_sizes (sequence or numpy.ndarray): Nominal pipe sizes.
+        pressures (array-like): Design pressures in psi.
+        allowable_stresses (array-like): Temperature-derated allowable stresses in psi.
+        corrosion_allowance (array-like): Corrosion and erosion allowance in inches.
+        mill_tolerance (float): Fraction of the nominal wall that may be missing (0.125 = 12.5%).
+        quality_factor, weld_factor, y_coefficient: As for required_wall_thickness().
+        dataset (str, optional): The dataset whose schedules are candidates,
+                                 e.g. "ASME B36.19" for stainless steel only.
+
+    Returns:
+        dict: Arrays with one entry per line: 'Schedules' (the names of the
+              chosen row, e.g. ("40", "STD", "40S"), or None), 'Wall Thickness'
+              (in), 'Pressure Design Thickness' t (in), 'Required Wall' (in),
+              'valid', which is False where the formula does not apply, and
+              'found', which is False where the size is unknown, the formula
+              does not apply, or no schedule is thick enough.
+    """
+    tables = _get_table_arrays(dataset)
+    wall_tables = _get_wall_tables(dataset)
+    pipe_sizes = np.asarray(pipe_sizes, dtype=str).ravel()
+    size_codes = _encode_values(pipe_sizes, tables["size_codes"], canonical_pipe_size)
+
+    outside_diameters = tables["in"]["OD"][size_codes]
+    thickness = np.broadcast_to(required_wall_thickness(
+        pressures, outside_diameters, allowable_stresses, quality_factor, weld_factor, y_coefficient
+    ), size_codes.shape)
+    required_wall = (thickness + corrosion_allowance) / (1 - mill_tolerance)
+    valid = np.broadcast_to(
+        (thickness < outside_diameters * THICK_WALL_RATIO)
+        & (np.asarray(pressures, dtype=np.float64)
+           <= MAX_PRESSURE_STRESS_RATIO * np.asarray(allowable_stresses, dtype=np.float64) * quality_factor),
+        size_codes.shape
+    )
+
+    position = np.searchsorted(wall_tables["keys"], size_codes * _WALL_KEY_SPACING + required_wall, side="left")
+    found = (position < wall_tables["ends"][size_codes]) & ~np.isnan(required_wall) & valid
+    chosen = np.where(found, position, -1)
+    return {
+        "Schedules": wall_tables["schedules"][chosen],
+        "Wall Thickness": wall_tables["walls"][chosen],
+        "Pressure Design Thickness": thickness,
+        "Required Wall": required_wall,
+        "valid": valid,
+        "found": found
+    }
+
+
+# --- Binary table files ---
+
+# File layout (little-endian):
+#   header   magic, version, row/alias/size/schedule counts, section offsets
+#   strings  size names then schedule names, each a uint16 length + UTF-8 bytes
+#   rows     int32 size codes, then float64 OD, ID, Wall; one entry per table row
+#   aliases  int32 schedule codes and int32 row numbers; one entry per schedule name
+# Every column starts on an 8-byte boundary so it can be mapped without copying.
+TABLE_FILE_MAGIC = b"PIPETBL\0"
+TABLE_FILE_VERSION = 2
+_TABLE_HEADER = struct.Struct("<8sIIIIII7Q")
+_COLUMN_NAMES = ("size_codes", "OD", "ID", "Wall Thickness", "alias_schedule_codes", "alias_rows")
+_COLUMN_FORMATS = ("i", "d", "d", "d", "i", "i")
+# The first four columns have one entry per row, the others one per alias
+_ROW_COLUMN_COUNT = 4
+
+
+def _align(offset, alignment=8):
+    """Rounds an offset up to the next multiple of alignment."""
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def export_pipe_table(path, pipe_index=None):
+    """
+    Writes a pipe index to a compact binary file that load_pipe_table() can map.
+
+    Each table row is stored once, with an alias table mapping every schedule
+    name (e.g. "40", "STD", "40S") to its row.
+
+    Args:
+        path (str): The file to write.
+        pipe_index (Mapping, optional): A (size, schedule) -> (OD, ID, Wall)
+                                        mapping. Defaults to PIPE_INDEX.
+
+    Returns:
+        int: The number of rows written.
+    """
+    if pipe_index is None:
+        pipe_index = PIPE_INDEX
+    size_codes, schedule_codes, rows, aliases = {}, {}, {}, []
+    for (pipe_size, schedule), record in pipe_index.items():
+        size_codes.setdefault(pipe_size, len(size_codes))
+        schedule_codes.setdefault(schedule, len(schedule_codes))
+        row = rows.setdefault((pipe_size, tuple(record)), len(rows))
+        aliases.append((schedule_codes[schedule], row))
+
+    strings = bytearray()
+    for name in list(size_codes) + list(schedule_codes):
+        encoded = name.encode("utf-8")
+        strings += struct.pack("<H", len(encoded)) + encoded
+
+    columns = (
+        [size_codes[pipe_size] for pipe_size, _ in rows],
+        [od for _, (od, _, _) in rows],
+        [inner_diameter for _, (_, inner_diameter, _) in rows],
+        [wall for _, (_, _, wall) in rows],
+        [schedule_code for schedule_code, _ in aliases],
+        [row for _, row in aliases]
+    )
+
+    strings_offset = _TABLE_HEADER.size
+    offset = _align(strings_offset + len(strings))
+    column_offsets = []
+    for column_format, values in zip(_COLUMN_FORMATS, columns):
+        column_offsets.append(offset)
+        offset = _align(offset + struct.calcsize(column_format) * len(values))
+
+    header = _TABLE_HEADER.pack(
+        TABLE_FILE_MAGIC, TABLE_FILE_VERSION, len(rows), len(aliases), len(size_codes), len(schedule_codes),
+        0, strings_offset, *column_offsets
+    )
+    with open(path, "wb") as table_file:
+        table_file.write(header)
+        table_file.write(strings)
+        for column_offset, column_format, values in zip(column_offsets, _COLUMN_FORMATS, columns):
+            table_file.write(b"\0" * (column_offset - table_file.tell()))
+            table_file.write(struct.pack(f"<{len(values)}{column_format}", *values))
+    return len(rows)
+
+
+def load_pipe_table(path):
+    """
+    Memory-maps a binary pipe table written by export_pipe_table().
+
+    The columns are views straight onto the mapped file, so nothing is copied
+    and every process that loads the same file shares one page-cached copy.
+    They are read-only NumPy arrays when NumPy is installed, otherwise
+    memoryviews. To look pipes up in the file, register it as a dataset with
+    register_dataset(name, path).
+
+    Args:
+        path (str): The binary table file.
+
+    Returns:
+        dict: 'sizes' and 'schedules' (tuples of names), the row columns
+              'size_codes', 'OD', 'ID', and 'Wall Thickness', the alias
+              columns 'alias_schedule_codes' and 'alias_rows', and 'index',
+              mapping (size, schedule) to a row number.
+
+    Raises:
+        ValueError: If the file is not a pipe table or has an unsupported version.
+    """
+    with open(path, "rb") as table_file:
+        mapped = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < _TABLE_HEADER.size:
+        raise ValueError(f"'{path}' is not a pipe table file.")
+    (magic, version, row_count, alias_count, size_count, schedule_count, _,
+     strings_offset, *column_offsets) = _TABLE_HEADER.unpack_from(mapped)
+    if magic != TABLE_FILE_MAGIC:
+        raise ValueError(f"'{path}' is not a pipe table file.")
+    if version != TABLE_FILE_VERSION:
+        raise ValueError(f"Unsupported pipe table file version {version} in '{path}'.")
+
+    names = []
+    offset = strings_offset
+    for _ in range(size_count + schedule_count):
+        (length,) = struct.unpack_from("<H", mapped, offset)
+        names.append(mapped[offset + 2:offset + 2 + length].decode("utf-8"))
+        offset += 2 + length
+    sizes, schedules = tuple(names[:size_count]), tuple(names[size_count:])
+
+    table = {"sizes": sizes, "schedules": schedules}
+    for column, (name, column_format, column_offset) in enumerate(
+            zip(_COLUMN_NAMES, _COLUMN_FORMATS, column_offsets)):
+        count = row_count if column < _ROW_COLUMN_COUNT else alias_count
+        if np is not None:
+            table[name] = np.frombuffer(mapped, dtype="<" + column_format, count=count, offset=column_offset)
+        elif sys.byteorder == "little":
+            end = column_offset + struct.calcsize(column_format) * count
+            table[name] = memoryview(mapped)[column_offset:end].cast(column_format)
+        else:
+            raise ValueError("Loading pipe table files without NumPy needs a little-endian machine.")
+
+    size_codes = table["size_codes"].tolist()
+    table["index"] = MappingProxyType({
+        (sizes[size_codes[row]], schedules[schedule_code]): row
+        for schedule_code, row in zip(table["alias_schedule_codes"].tolist(), table["alias_rows"].tolist())
+    })
+    return table
+
+
+def _compile_table_file(path):
+    """
+    Builds the cache entry of a dataset registered as a binary table file.
+
+    The index is built straight from the mapped columns, one shared record
+    per row, so nothing is parsed. The nested 'data' is rebuilt from the
+    alias table for get_dataset().
+    """
+    table = load_pipe_table(path)
+    sizes = [canonical_pipe_size(name) or name for name in table["sizes"]]
+    schedules = [canonical_schedule(name) or name for name in table["schedules"]]
+    size_codes = table["size_codes"].tolist()
+    records = [
+        PipeDimensions(od, inner_diameter, wall)
+        for od, inner_diameter, wall in zip(table["OD"].tolist(), table["ID"].tolist(),
+                                            table["Wall Thickness"].tolist())
+    ]
+
+    index, row_schedules = {}, [[] for _ in records]
+    for schedule_code, row in zip(table["alias_schedule_codes"].tolist(), table["alias_rows"].tolist()):
+        index.setdefault((sizes[size_codes[row]], schedules[schedule_code]), records[row])
+        row_schedules[row].append(schedules[schedule_code])
+
+    data = {}
+    for row, record in enumerate(records):
+        pipe_size_info = data.setdefault(sizes[size_codes[row]], {"OD": record.od, "schedules": {}})
+        pipe_size_info["schedules"][tuple(row_schedules[row])] = {"ID": record.id, "Wall": record.wall}
+
+    index = MappingProxyType(index)
+    return {
+        "data": _freeze_pipe_data(data), "index": index, "index_mm": _build_metric_index(index), "table": table
+    }
+
+
+# --- pandas and Arrow export ---
+
+TABLE_COLUMNS = ("Pipe Size", "Schedule", "OD", "ID", "Wall Thickness")
+
+
+def _require_pandas():
+    """
+    Imports pandas, raising an ImportError with a clear message when it is not installed.
+
+    pandas (and pyarrow, below) are imported on first use rather than at the
+    top of the module, since importing them takes longer than the whole rest
+    of the module and most runs never need them.
+    """
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("pandas is required for DataFrame export. Install it with 'pip install pandas'.") from None
+    return pandas
+
+
+def _require_pyarrow():
+    """Imports pyarrow, raising an ImportError with a clear message when it is not installed."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow is required for Arrow export. Install it with 'pip install pyarrow'.") from None
+    return pyarrow
+
+
+def _get_table_columns(dataset=None, units="in"):
+    """
+    Returns the pipe table as flat, read-only column arrays, building them on first use.
+
+    The columns are gathered once from the dense lookup arrays, one row per
+    (size, schedule) pair, and are then shared by every DataFrame and Arrow
+    table exported from the dataset without further copies. Sizes are listed,
+    coded, and ordered by nominal size, whatever order the dataset gives them in.
+
+    Returns:
+        dict: 'size_codes' and 'schedule_codes' (integer codes into the 'sizes'
+              and 'schedules' name lists), and the 'OD', 'ID', and 'Wall
+              Thickness' float64 arrays, plus 'DN' (int64) for "mm".
+    """
+    if units not in UNITS:
+        raise ValueError(f"Unknown units: '{units}'. Use one of {', '.join(UNITS)}.")
+    tables = _get_table_arrays(dataset)
+    compiled = _get_compiled_dataset(dataset)
+    table_columns = compiled.setdefault("columns", {})
+    if units in table_columns:
+        return table_columns[units]
+
+    # Leave out the extra "not found" row and column of the dense arrays
+    size_codes, schedule_codes = np.nonzero(tables["found"][:-1, :-1])
+    # The dense arrays follow the dataset's own order; the exported sizes follow
+    # nominal size order (sizes that are not numbers go last), and so do the rows
+    sizes = list(tables["size_codes"])
+    nominal_sizes = [_parse_nominal_size(pipe_size) for pipe_size in sizes]
+    size_order = sorted(range(len(sizes)),
+                        key=lambda code: (nominal_sizes[code] is None, nominal_sizes[code] or 0))
+    size_ranks = np.empty(len(sizes), dtype=np.intp)
+    size_ranks[size_order] = np.arange(len(sizes))
+    rows = np.lexsort((schedule_codes, size_ranks[size_codes]))
+    size_codes, schedule_codes = size_codes[rows], schedule_codes[rows]
+    dense = tables[units]
+    # int8 codes are what pandas itself uses for up to 127 categories, so they are not converted again
+    code_type = np.int8 if max(len(tables["size_codes"]), len(tables["schedule_codes"])) < 128 else np.int16
+    columns = {
+        "size_codes": size_ranks[size_codes].astype(code_type),
+        "schedule_codes": schedule_codes.astype(code_type),
+        "OD": dense["OD"][size_codes],
+        "ID": dense["ID"][size_codes, schedule_codes],
+        "Wall Thickness": dense["Wall Thickness"][size_codes, schedule_codes]
+    }
+    if units == "mm":
+        columns["DN"] = tables["DN"][size_codes]
+    for array in columns.values():
+        array.flags.writeable = False
+    columns["sizes"] = [sizes[code] for code in size_order]
+    columns["schedules"] = list(tables["schedule_codes"])
+    table_columns[units] = columns
+    return columns
+
+
+def pipe_table_frame(dataset=None, units="in"):
+    """
+    Returns the pipe table as a pandas DataFrame, one row per size and schedule.
+
+    'Pipe Size' is an ordered categorical (in nominal size order) and 'Schedule'
+    a categorical; 'OD', 'ID', and 'Wall Thickness' are float64 columns
+    ('DN' is added for "mm"). The frame is built once per dataset and units;
+    each call returns a shallow copy, so its float columns share memory with
+    the cached table arrays.
+
+    Args:
+        dataset (str, optional): The dataset to export. Defaults to DEFAULT_DATASET.
+        units (str): "in" (default) or "mm".
+
+    Raises:
+        ImportError: If NumPy or pandas is not installed.
+    """
+    pandas = _require_pandas()
+    columns = _get_table_columns(dataset, units)
+    frame = columns.get("frame")
+    if frame is None:
+        data = {
+            "Pipe Size": pandas.Categorical.from_codes(columns["size_codes"], columns["sizes"], ordered=True),
+            "Schedule": pandas.Categorical.from_codes(columns["schedule_codes"], columns["schedules"])
+        }
+        for column in TABLE_COLUMNS[2:] + (("DN",) if units == "mm" else ()):
+            data[column] = columns[column]
+        frame = columns["frame"] = pandas.DataFrame(data, copy=False)
+    return frame.copy(deep=False)
+
+
+def pipe_table_arrow(dataset=None, units="in"):
+    """
+    Returns the pipe table as a pyarrow Table with the columns of pipe_table_frame().
+
+    'Pipe Size' and 'Schedule' are dictionary-encoded; the numeric columns
+    wrap the cached table arrays without copying. The table is built once per
+    dataset and units.
+
+    Raises:
+        ImportError: If NumPy or pyarrow is not installed.
+    """
+    pyarrow = _require_pyarrow()
+    columns = _get_table_columns(dataset, units)
+    table = columns.get("arrow")
+    if table is None:
+        arrays = [
+            pyarrow.DictionaryArray.from_arrays(columns["size_codes"], columns["sizes"], ordered=True),
+            pyarrow.DictionaryArray.from_arrays(columns["schedule_codes"], columns["schedules"])
+        ]
+        names = list(TABLE_COLUMNS) + (["DN"] if units == "mm" else [])
+        arrays += [pyarrow.array(columns[column]) for column in names[2:]]
+        table = columns["arrow"] = pyarrow.Table.from_arrays(arrays, names=names)
+    return table
+
+
+def _encode_column(pandas, column, codes, normalize):
+    """
+    Converts a DataFrame column into integer codes, like _encode_values().
+
+    pandas.factorize hashes the column instead of sorting it, and reuses the
+    existing codes of a categorical column, so only the distinct values are
+    normalized. Missing values get the "not found" code len(codes).
+    """
+    value_codes, unique_values = pandas.factorize(column)
+    missing_code = len(codes)
+    unique_codes = np.fromiter(
+        (codes.get(normalize(str(value)), missing_code) for value in unique_values),
+        dtype=np.intp,
+        count=len(unique_values)
+    )
+    # Missing values are factorized to -1, which picks the appended "not found" code
+    return np.append(unique_codes, missing_code)[value_codes]
+
+
+def merge_pipe_dimensions(frame, size_column="size", schedule_column="schedule", dataset=None, units="in"):
+    """
+    Adds the OD, ID, and Wall Thickness of every row to a DataFrame.
+
+    This is a vectorized join against the lookup arrays: the size and schedule
+    columns are turned into codes and the dimensions gathered with one
+    indexing step per column, instead of a lookup per row.
+
+    Args:
+        frame (pandas.DataFrame): The rows to annotate; it is not modified.
+        size_column (str): The column holding the nominal pipe size.
+        schedule_column (str): The column holding the schedule.
+        dataset (str, optional): The dataset to search. Defaults to DEFAULT_DATASET.
+        units (str): "in" (default) or "mm"; with "mm" a 'DN' column is added too.
+
+    Returns:
+        pandas.DataFrame: A copy of frame with 'OD', 'ID', and 'Wall Thickness'
+                          float64 columns, NaN where no data was found.
+
+    Raises:
+        ValueError: If the units are unknown.
+        ImportError: If NumPy or pandas is not installed.
+    """
+    pandas = _require_pandas()
+    if units not in UNITS:
+        raise ValueError(f"Unknown units: '{units}'. Use one of {', '.join(UNITS)}.")
+    tables = _get_table_arrays(dataset)
+    size_codes = _encode_column(pandas, frame[size_column], tables["size_codes"], canonical_pipe_size)
+    schedule_codes = _encode_column(pandas, frame[schedule_column], tables["schedule_codes"], canonical_schedule)
+
+    found = tables["found"][size_codes, schedule_codes]
+    dense = tables[units]
+    dimensions = {
+        "OD": np.where(found, dense["OD"][size_codes], np.nan),
+        "ID": dense["ID"][size_codes, schedule_codes],
+        "Wall Thickness": dense["Wall Thickness"][size_codes, schedule_codes]
+    }
+    if units == "mm":
+        dimensions["DN"] = np.where(found, tables["DN"][size_codes], 0)
+    return frame.assign(**dimensions)
+
+
+# --- Streaming bulk lookup for CSV/JSONL line lists ---
+
+DIMENSION_COLUMNS = ("OD", "ID", "Wall Thickness")
+
+
+def _detect_format(path, file_format=None):
+    """Returns 'csv' or 'jsonl', using the file extension when no format is given."""
+    if file_format:
+        return file_format
+    if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+class MalformedRow(str):
+    """
+    The raw text of a line list record that could not be read as a row.
+
+    read_line_list() yields one of these for a CSV row with more fields than
+    the header or a JSONL line that is not a JSON object, so the record can
+    go to the rejects instead of stopping the run.
+    """
+
+
+def _read_csv_rows(reader):
+    """Yields the rows of a csv.DictReader, with rows that have extra fields as MalformedRow."""
+    for row in reader:
+        # DictReader collects the fields beyond the header under the key None
+        extra_fields = row.pop(None, None)
+        if extra_fields is None:
+            yield row
+        else:
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator="").writerow(list(row.values()) + extra_fields)
+            yield MalformedRow(buffer.getvalue())
+
+
+def read_line_list(stream, file_format="csv"):
+    """
+    Yields one dictionary per row of a CSV or JSONL line list.
+
+    Rows are read lazily, so only the current row is held in memory.
+    Blank JSONL lines are skipped, and records that are not valid rows are
+    yielded as MalformedRow strings.
+    """
+    if file_format == "csv":
+        yield from _read_csv_rows(csv.DictReader(stream))
+    elif file_format == "jsonl":
+        for line in stream:
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield row if isinstance(row, dict) else MalformedRow(line.rstrip("\r\n"))
+    else:
+        raise ValueError(f"Unsupported line list format: '{file_format}'. Use 'csv' or 'jsonl'.")
+
+
+def _lookup_chunk(pipe_sizes, schedules, dataset=None, units="in"):
+    """Returns an (OD, ID, Wall) tuple, or None when not found, for each pipe in a chunk."""
+    if np is None:
+        stats = _lookup_stats
+        if stats is not None:
+            started = perf_counter()
+        pipe_index = _get_pipe_index(dataset, units)
+        records = [
+            pipe_index.get((canonical_pipe_size(pipe_size), canonical_schedule(schedule)))
+            for pipe_size, schedule in zip(pipe_sizes, schedules)
+        ]
+        if stats is not None:
+            missed_pairs = [pair for pair, record in zip(zip(pipe_sizes, schedules), records) if record is None]
+            _record_misses(stats, "stream", perf_counter() - started,
+                           len(records) - len(missed_pairs), missed_pairs, dataset)
+        return records
+
+    result = _lookup_batch(pipe_sizes, schedules, dataset, "stream", units)
+    return [
+        (od, inner_diameter, wall) if found else None
+        for od, inner_diameter, wall, found in zip(
+            result["OD"].tolist(),
+            result["ID"].tolist(),
+            result["Wall Thickness"].tolist(),
+            result["found"].tolist()
+        )
+    ]
+
+
+def annotate_line_list(rows, size_column="size", schedule_column="schedule", chunk_size=10000,
+                       dataset=None, units="in"):
+    """
+    Looks up the dimensions of every row in an iterable of line list rows.
+
+    Rows are pulled and looked up 'chunk_size' at a time, so memory use is
+    bounded by the chunk size rather than by the length of the input.
+
+    Args:
+        rows (iterable of dict): Line list rows, e.g. from read_line_list().
+        size_column (str): The key holding the nominal pipe size.
+        schedule_column (str): The key holding the schedule.
+        chunk_size (int): The number of rows looked up together.
+        dataset (str, optional): The dataset to search. Defaults to DEFAULT_DATASET.
+        units (str): "in" (default) or "mm" for the returned dimensions.
+
+    Yields:
+        tuple: (row, dimensions) where dimensions is an (OD, ID, Wall) tuple,
+               or None if no data was found for the row or it is a MalformedRow.
     """
-    Retrieves the OD, ID, and Wall Thickness for a given pipe nominal size and schedule.
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        # A MalformedRow is looked up as an empty pipe, which is never found
+        records = [row if isinstance(row, dict) else {} for row in chunk]
+        pipe_sizes = [str(row.get(size_column) or "") for row in records]
+        schedules = [str(row.get(schedule_column) or "") for row in records]
+        yield from zip(chunk, _lookup_chunk(pipe_sizes, schedules, dataset, units))
+
+
+def stream_line_list(input_stream, output_stream, reject_stream, file_format="csv",
+                     size_column="size", schedule_column="schedule", chunk_size=10000,
+                     dataset=None, units="in"):
+    """
+    Annotates a CSV or JSONL line list with OD, ID, and Wall Thickness columns.
+
+    Rows with data are written to output_stream with the dimension columns
+    appended, in inches or millimetres as chosen by 'units'. Rows without data,
+    and records that cannot be read as rows, are written unchanged to
+    reject_stream, in the same format, so a bad row never stops the run.
+
+    Returns:
+        tuple: (number of rows written, number of rows rejected)
+    """
+    fieldnames = None
+    if file_format == "csv":
+        reader = csv.DictReader(input_stream)
+        rows = _read_csv_rows(reader)
+        # Peek at the first row so the CSV header is read before writing
+        first_row = next(rows, None)
+        if first_row is None:
+            return 0, 0
+        fieldnames = reader.fieldnames
+        rows = chain([first_row], rows)
+    else:
+        rows = read_line_list(input_stream, file_format)
+
+    return _write_annotated_rows(rows, output_stream, reject_stream, fieldnames, True,
+                                 size_column, schedule_column, chunk_size, dataset, units)
+
+
+def _write_annotated_rows(rows, output_stream, reject_stream, fieldnames, write_header,
+                          size_column, schedule_column, chunk_size, dataset, units):
+    """
+    Writes annotated rows and rejects as CSV (when fieldnames are given) or JSONL.
+
+    Returns:
+        tuple: (number of rows written, number of rows rejected)
+    """
+    written = rejected = 0
+
+    if fieldnames is not None:
+        output_writer = csv.DictWriter(output_stream, fieldnames + list(DIMENSION_COLUMNS))
+        reject_writer = csv.DictWriter(reject_stream, fieldnames)
+        if write_header:
+            output_writer.writeheader()
+            reject_writer.writeheader()
+
+        def write_row(row, dimensions):
+            output_writer.writerow({**row, **dict(zip(DIMENSION_COLUMNS, dimensions))})
+
+        def write_reject(row):
+            if isinstance(row, MalformedRow):
+                reject_stream.write(row + "\r\n")
+            else:
+                reject_writer.writerow(row)
+    else:
+        def write_row(row, dimensions):
+            output_stream.write(json.dumps({**row, **dict(zip(DIMENSION_COLUMNS, dimensions))}) + "\n")
+
+        def write_reject(row):
+            reject_stream.write((row if isinstance(row, MalformedRow) else json.dumps(row)) + "\n")
+
+    for row, dimensions in annotate_line_list(rows, size_column, schedule_column, chunk_size,
+                                              dataset, units):
+        if dimensions is None:
+            write_reject(row)
+            rejected += 1
+        else:
+            write_row(row, dimensions)
+            written += 1
+
+    return written, rejected
+
+
+# --- Parallel execution over sharded line lists ---
+
+# Shards per worker; more shards than workers keeps every worker busy
+SHARDS_PER_WORKER = 4
+
+
+def _csv_header(path):
+    """Returns the CSV field names and the byte offset just after the header record."""
+    lines = _ShardLines(path, 0, 1)
+    for fieldnames in csv.reader(lines):
+        return fieldnames, lines.position
+    return [], 0
+
+
+def shard_line_list(path, shard_count, start=0):
+    """
+    Splits a file into byte ranges that begin and end on line boundaries.
+
+    Each split point is moved forward to the start of the next line, so no
+    line is cut in two. A CSV record may still span a split point when a
+    quoted field contains a newline; _ShardLines and _ordered_shard_results()
+    move such shards to the real record boundary.
 
     Args:
-        pipe_size_input (str): The nominal pipe size (e.g., "1/8", "1", "2 1/2").
-                                The input can include '"' (e.g., "1/8\"") but it will be removed.
-        schedule_input (str): The pipe schedule (e.g., "40", "STD", "XS", "160").
+        path (str): The file to split.
+        shard_count (int): The number of ranges to aim for. Fewer are returned
+                           for small files.
+        start (int): The offset to start from, e.g. just after a CSV header.
 
     Returns:
-        dict or str: A dictionary containing 'OD', 'ID', and 'Wall' if a match is found,
-                     otherwise a string indicating that the data was not found.
+        list: (start offset, end offset) pairs covering the file in order.
     """
+    size = os.path.getsize(path)
+    boundaries = [start]
+    with open(path, "rb") as line_list:
+        for shard in range(1, shard_count):
+            target = start + (size - start) * shard // shard_count
+            if target <= boundaries[-1]:
+                continue
+            line_list.seek(target - 1)
+            line_list.readline()
+            boundary = line_list.tell()
+            if boundaries[-1] < boundary < size:
+                boundaries.append(boundary)
+    boundaries.append(size)
+    return [(shard_start, shard_end) for shard_start, shard_end in zip(boundaries, boundaries[1:])
+            if shard_start < shard_end]
 
-    # Normalize the input pipe size by removing quotes and standardizing spaces
-    # This helps in matching user input with the data structure
-    normalized_pipe_size = pipe_size_input.replace('"', '').strip()
-    normalized_schedule = schedule_input.upper().strip() # Convert schedule to uppercase for consistent matching
-
-    # Data structure containing pipe dimensions based on nominal size and schedule.
-    # This dictionary is structured for efficient lookup:
-    # {
-    #   "Pipe Size": {
-    #     "OD": <Outer Diameter>,
-    #     "schedules": {
-    #       ("Schedule1", "Schedule2"): {"ID": <Inner Diameter>, "Wall": <Wall Thickness>},
-    #       ...
-    #     }
-    #   },
-    #   ...
-    # }
-    pipe_data = {
-        "1/8": {
-            "OD": 0.405,
-            "schedules": {
-                ("10", "10S"): {"ID": 0.307, "Wall": 0.049},
-                ("40", "STD", "40S"): {"ID": 0.269, "Wall": 0.068},
-                ("80", "XS", "80S"): {"ID": 0.215, "Wall": 0.095}
-            }
-        },
-        "1/4": {
-            "OD": 0.54,
-            "schedules": {
-                ("10", "10S"): {"ID": 0.41, "Wall": 0.065},
-                ("40", "STD", "40S"): {"ID": 0.364, "Wall": 0.088},
-                ("80", "XS", "80S"): {"ID": 0.302, "Wall": 0.119}
-            }
-        },
-        "3/8": {
-            "OD": 0.675,
-            "schedules": {
-                ("10", "10S"): {"ID": 0.545, "Wall": 0.065},
-                ("40", "STD", "40S"): {"ID": 0.493, "Wall": 0.091},
-                ("80", "XS", "80S"): {"ID": 0.423, "Wall": 0.126}
-            }
-        },
-        "1/2": {
-            "OD": 0.84,
-            "schedules": {
-                ("5", "5S"): {"ID": 0.71, "Wall": 0.065},
-                ("10", "10S"): {"ID": 0.674, "Wall": 0.083},
-                ("40", "STD", "40S"): {"ID": 0.622, "Wall": 0.109},
-                ("80", "XS", "80S"): {"ID": 0.546, "Wall": 0.147},
-                ("160",): {"ID": 0.466, "Wall": 0.187},
-                ("XX",): {"ID": 0.252, "Wall": 0.294}
-            }
-        },
-        "3/4": {
-            "OD": 1.05,
-            "schedules": {
-                ("5", "5S"): {"ID": 0.92, "Wall": 0.065},
-                ("10", "10S"): {"ID": 0.884, "Wall": 0.083},
-                ("40", "STD", "40S"): {"ID": 0.824, "Wall": 0.113},
-                ("80", "XS", "80S"): {"ID": 0.742, "Wall": 0.154},
-                ("160",): {"ID": 0.614, "Wall": 0.218},
-                ("XX",): {"ID": 0.434, "Wall": 0.308}
-            }
-        },
-        "1": {
-            "OD": 1.315,
-            "schedules": {
-                ("5", "5S"): {"ID": 1.185, "Wall": 0.065},
-                ("10", "10S"): {"ID": 1.097, "Wall": 0.109},
-                ("40", "STD", "40S"): {"ID": 1.049, "Wall": 0.133},
-                ("80", "XS", "80S"): {"ID": 0.957, "Wall": 0.179},
-                ("160",): {"ID": 0.815, "Wall": 0.25},
-                ("XX",): {"ID": 0.599, "Wall": 0.358}
-            }
-        },
-        "1 1/4": {
-            "OD": 1.66,
-            "schedules": {
-                ("5", "5S"): {"ID": 1.53, "Wall": 0.065},
-                ("10", "10S"): {"ID": 1.442, "Wall": 0.109},
-                ("40", "STD", "40S"): {"ID": 1.38, "Wall": 0.14},
-                ("80", "XS", "80S"): {"ID": 1.278, "Wall": 0.191},
-                ("160",): {"ID": 1.16, "Wall": 0.25},
-                ("XX",): {"ID": 0.896, "Wall": 0.382}
-            }
-        },
-        "1 1/2": {
-            "OD": 1.9,
-            "schedules": {
-                ("5", "5S"): {"ID": 1.77, "Wall": 0.065},
-                ("10", "10S"): {"ID": 1.682, "Wall": 0.109},
-                ("40", "STD", "40S"): {"ID": 1.61, "Wall": 0.145},
-                ("80", "XS", "80S"): {"ID": 1.5, "Wall": 0.2},
-                ("160",): {"ID": 1.337, "Wall": 0.281},
-                ("XX",): {"ID": 1.1, "Wall": 0.4}
-            }
-        },
-        "2": {
-            "OD": 2.375,
-            "schedules": {
-                ("5", "5S"): {"ID": 2.225, "Wall": 0.065},
-                ("10", "10S"): {"ID": 2.157, "Wall": 0.109},
-                ("40", "STD", "40S"): {"ID": 2.067, "Wall": 0.154},
-                ("80", "XS", "80S"): {"ID": 1.939, "Wall": 0.218},
-                ("160",): {"ID": 1.687, "Wall": 0.344},
-                ("XX",): {"ID": 1.503, "Wall": 0.436}
-            }
-        },
-        "2 1/2": {
-            "OD": 2.875,
-            "schedules": {
-                ("5", "5S"): {"ID": 2.709, "Wall": 0.083},
-                ("10", "10S"): {"ID": 2.635, "Wall": 0.12},
-                ("40", "STD", "40S"): {"ID": 2.469, "Wall": 0.203},
-                ("80", "XS", "80S"): {"ID": 2.323, "Wall": 0.276},
-                ("160",): {"ID": 2.125, "Wall": 0.375},
-                ("XX",): {"ID": 1.771, "Wall": 0.552}
-            }
-        },
-        "3": {
-            "OD": 3.5,
-            "schedules": {
-                ("5", "5S"): {"ID": 3.334, "Wall": 0.083},
-                ("10", "10S"): {"ID": 3.26, "Wall": 0.12},
-                ("40", "STD", "40S"): {"ID": 3.068, "Wall": 0.216},
-                ("80", "XS", "80S"): {"ID": 2.9, "Wall": 0.3},
-                ("160",): {"ID": 2.624, "Wall": 0.438},
-                ("XX",): {"ID": 2.3, "Wall": 0.6}
-            }
-        },
-        "3 1/2": {
-            "OD": 4.0,
-            "schedules": {
-                ("5", "5S"): {"ID": 3.834, "Wall": 0.083},
-                ("10", "10S"): {"ID": 3.76, "Wall": 0.12},
-                ("40", "STD", "40S"): {"ID": 3.548, "Wall": 0.226},
-                ("80", "XS", "80S"): {"ID": 3.364, "Wall": 0.318},
-                ("XX",): {"ID": 2.728, "Wall": 0.636}
-            }
-        },
-        "4": {
-            "OD": 4.5,
-            "schedules": {
-                ("5", "5S"): {"ID": 4.334, "Wall": 0.083},
-                ("10", "10S"): {"ID": 4.26, "Wall": 0.12},
-                ("40", "STD", "40S"): {"ID": 4.026, "Wall": 0.237},
-                ("80", "XS", "80S"): {"ID": 3.826, "Wall": 0.337},
-                ("120",): {"ID": 3.624, "Wall": 0.438},
-                ("160",): {"ID": 3.438, "Wall": 0.531},
-                ("XX",): {"ID": 3.152, "Wall": 0.674}
-            }
-        },
-        "4 1/2": {
-            "OD": 5.0,
-            "schedules": {
-                ("10", "10S"): {"ID": 4.506, "Wall": 0.247},
-                ("STD", "40S"): {"ID": 4.506, "Wall": 0.247},
-                ("XS", "80S"): {"ID": 4.29, "Wall": 0.355}
-            }
-        },
-        "5": {
-            "OD": 5.563,
-            "schedules": {
-                ("5", "5S"): {"ID": 5.345, "Wall": 0.109},
-                ("10", "10S"): {"ID": 5.295, "Wall": 0.134},
-                ("40", "STD", "40S"): {"ID": 5.047, "Wall": 0.258},
-                ("80", "XS", "80S"): {"ID": 4.813, "Wall": 0.375},
-                ("120",): {"ID": 4.563, "Wall": 0.5},
-                ("160",): {"ID": 4.313, "Wall": 0.625},
-                ("XX",): {"ID": 4.063, "Wall": 0.75}
-            }
-        },
-        "6": {
-            "OD": 6.625,
-            "schedules": {
-                ("5", "5S"): {"ID": 6.407, "Wall": 0.109},
-                ("10", "10S"): {"ID": 6.357, "Wall": 0.134},
-                ("40", "STD", "40S"): {"ID": 6.065, "Wall": 0.28},
-                ("80", "XS", "80S"): {"ID": 5.761, "Wall": 0.432},
-                ("120",): {"ID": 5.501, "Wall": 0.562},
-                ("160",): {"ID": 5.189, "Wall": 0.719},
-                ("XX",): {"ID": 4.897, "Wall": 0.864}
-            }
-        },
-        "7": {
-            "OD": 7.625,
-            "schedules": {
-                ("STD", "40", "40S"): {"ID": 7.005, "Wall": 0.31},
-                ("XS", "80", "80S"): {"ID": 6.625, "Wall": 0.5},
-                ("XX",): {"ID": 5.875, "Wall": 0.875}
-            }    
-        },
-        "8": {
-            "OD": 8.625,
-            "schedules": {
-                ("5S",): {"ID": 8.407, "Wall": 0.109},
-                ("10", "10S"): {"ID": 8.329, "Wall": 0.148},
-                ("20",): {"ID": 8.125, "Wall": 0.25},
-                ("30",): {"ID": 8.071, "Wall": 0.277},
-                ("40", "STD", "40S"): {"ID": 7.981, "Wall": 0.322},
-                ("60",): {"ID": 7.813, "Wall": 0.406},
-                ("80", "XS", "80S"): {"ID": 7.625, "Wall": 0.5},
-                ("100",): {"ID": 7.439, "Wall": 0.594},
-                ("120",): {"ID": 7.189, "Wall": 0.719},
-                ("140",): {"ID": 7.001, "Wall": 0.812},
-                ("160",): {"ID": 6.813, "Wall": 0.906},
-                ("XX",): {"ID": 6.875, "Wall": 0.875}
-            }
-        },
-        "9": {
-            "OD": 9.625,
-            "schedules": {
-                ("STD", "40", "40S"): {"ID": 8.941, "Wall": 0.342},
-                ("XS", "80", "80S"): {"ID": 8.625, "Wall": 0.5},
-                ("XX",): {"ID": 7.875, "Wall": 0.875}
-            }
-        },
-        "10": {
-            "OD": 10.75,
-            "schedules": {
-                ("5S",): {"ID": 10.482, "Wall": 0.134},
-                ("10", "10S"): {"ID": 10.42, "Wall": 0.165},
-                ("20",): {"ID": 10.25, "Wall": 0.25},
-                ("30",): {"ID": 10.136, "Wall": 0.307},
-                ("40", "STD", "40S"): {"ID": 10.02, "Wall": 0.365},
-                ("60", "XS", "80S"): {"ID": 9.75, "Wall": 0.5},
-                ("80",): {"ID": 9.564, "Wall": 0.594},
-                ("100",): {"ID": 9.314, "Wall": 0.719},
-                ("120",): {"ID": 9.064, "Wall": 0.844},
-                ("140", "XX"): {"ID": 8.75, "Wall": 1.0},
-                ("160",): {"ID": 8.5, "Wall": 1.125}
-            }
-        },    
-        "11": {
-            "OD": 11.75,
-            "schedules": {
-                ("STD", "40", "40S"): {"ID": 11.0, "Wall": 0.375},
-                ("XS", "80", "80S"): {"ID": 10.75, "Wall": 0.5},
-                ("XX",): {"ID": 10.0, "Wall": 0.875}
-            }
-        },
-        "12": {
-            "OD": 12.75,
-            "schedules": {
-                ("5S",): {"ID": 12.438, "Wall": 0.156},
-                ("10", "10S"): {"ID": 12.39, "Wall": 0.18},
-                ("20",): {"ID": 12.25, "Wall": 0.25},
-                ("30",): {"ID": 12.09, "Wall": 0.33},
-                ("STD", "40S"): {"ID": 12.0, "Wall": 0.375},
-                ("40",): {"ID": 11.938, "Wall": 0.406},
-                ("XS", "80S"): {"ID": 11.75, "Wall": 0.5},
-                ("60",): {"ID": 11.626, "Wall": 0.562},
-                ("80",): {"ID": 11.376, "Wall": 0.688},
-                ("100",): {"ID": 11.064, "Wall": 0.844},
-                ("120", "XX"): {"ID": 10.75, "Wall": 1.0},
-                ("140",): {"ID": 10.5, "Wall": 1.125},
-                ("160",): {"ID": 10.126, "Wall": 1.312}
-            }
-        },
-        "14": {
-            "OD": 14.0,
-            "schedules": {
-                ("10S",): {"ID": 13.624, "Wall": 0.188},
-                ("10",): {"ID": 13.5, "Wall": 0.25},
-                ("20",): {"ID": 13.375, "Wall": 0.312},
-                ("30", "STD", "40S"): {"ID": 13.25, "Wall": 0.375},
-                ("40",): {"ID": 13.124, "Wall": 0.438},
-                ("XS", "80S"): {"ID": 13.0, "Wall": 0.5},
-                ("60",): {"ID": 12.814, "Wall": 0.594},
-                ("80",): {"ID": 12.5, "Wall": 0.75},
-                ("100",): {"ID": 12.124, "Wall": 0.938},
-                ("120",): {"ID": 11.814, "Wall": 1.09},
-                ("140",): {"ID": 11.5, "Wall": 1.25},
-                ("160",): {"ID": 11.188, "Wall": 1.406}
-            }
-        },
-        "16": {
-            "OD": 16.0,
-            "schedules": {
-                ("10S",): {"ID": 15.624, "Wall": 0.188},
-                ("10",): {"ID": 15.5, "Wall": 0.25},
-                ("20",): {"ID": 15.375, "Wall": 0.312},
-                ("30", "STD", "40S"): {"ID": 15.25, "Wall": 0.375},
-                ("40", "XS", "80S"): {"ID": 15.0, "Wall": 0.5},
-                ("60",): {"ID": 14.688, "Wall": 0.656},
-                ("80",): {"ID": 14.314, "Wall": 0.844},
-                ("100",): {"ID": 13.938, "Wall": 1.031},
-                ("120",): {"ID": 13.564, "Wall": 1.22},
-                ("140",): {"ID": 13.124, "Wall": 1.438},
-                ("160",): {"ID": 12.814, "Wall": 1.594}
-            }
-        },
-        "18": {
-            "OD": 18.0,
-            "schedules": {
-                ("10S",): {"ID": 17.624, "Wall": 0.188},
-                ("10",): {"ID": 17.5, "Wall": 0.25},
-                ("20",): {"ID": 17.375, "Wall": 0.312},
-                ("STD", "40S"): {"ID": 17.25, "Wall": 0.375},
-                ("30",): {"ID": 17.124, "Wall": 0.438},
-                ("XS", "80S"): {"ID": 17.0, "Wall": 0.5},
-                ("40",): {"ID": 16.876, "Wall": 0.562},
-                ("60",): {"ID": 16.5, "Wall": 0.75},
-                ("80",): {"ID": 16.126, "Wall": 0.938},
-                ("100",): {"ID": 15.688, "Wall": 1.156},
-                ("120",): {"ID": 15.25, "Wall": 1.38},
-                ("140",): {"ID": 14.876, "Wall": 1.562},
-                ("160",): {"ID": 14.438, "Wall": 1.781}
-            }
-        },
-        "20": {
-            "OD": 20.0,
-            "schedules": {
-                ("10S",): {"ID": 19.564, "Wall": 0.218},
-                ("10",): {"ID": 19.5, "Wall": 0.25},
-                ("20", "STD", "40S"): {"ID": 19.25, "Wall": 0.375},
-                ("30", "XS", "80S"): {"ID": 19.0, "Wall": 0.5},
-                ("40",): {"ID": 18.812, "Wall": 0.594},
-                ("60",): {"ID": 18.376, "Wall": 0.812},
-                ("80",): {"ID": 17.938, "Wall": 1.031},
-                ("100",): {"ID": 17.438, "Wall": 1.281},
-                ("120",): {"ID": 17.0, "Wall": 1.5},
-                ("140",): {"ID": 16.5, "Wall": 1.75},
-                ("160",): {"ID": 16.064, "Wall": 1.969}
-            }
-            },
-        "22": {
-            "OD": 22.0,
-            "schedules": {
-                ("10", "10S"): {"ID": 21.5, "Wall": 0.25},
-                ("STD", "20", "40S"): {"ID": 21.25, "Wall": 0.375},
-                ("XS", "30", "80S"): {"ID": 21.0, "Wall": 0.5},
-                ("60",): {"ID": 20.25, "Wall": 0.875},
-                ("80",): {"ID": 19.75, "Wall": 1.125},
-                ("100",): {"ID": 19.25, "Wall": 1.375},
-                ("120",): {"ID": 18.749, "Wall": 1.626},
-                ("140",): {"ID": 18.25, "Wall": 1.875},
-                ("160",): {"ID": 17.75, "Wall": 2.125}
-            }
-        },
-        "24": {
-            "OD": 24.0,
-            "schedules": {
-                ("10", "10S"): {"ID": 23.5, "Wall": 0.25},
-                ("20", "STD", "40S"): {"ID": 23.25, "Wall": 0.375},
-                ("XS", "80S"): {"ID": 23.0, "Wall": 0.5},
-                ("30",): {"ID": 22.876, "Wall": 0.562},
-                ("40",): {"ID": 22.626, "Wall": 0.688},
-                ("60",): {"ID": 22.064, "Wall": 0.969},
-                ("80",): {"ID": 21.564, "Wall": 1.219},
-                ("100",): {"ID": 20.938, "Wall": 1.531},
-                ("120",): {"ID": 20.376, "Wall": 1.812},
-                ("140",): {"ID": 19.876, "Wall": 2.062},
-                ("160",): {"ID": 19.314, "Wall": 2.344}
-            }
-        },
-        "26": {
-            "OD": 26.0,
-            "schedules": {
-                ("10",): {"ID": 25.376, "Wall": 0.312},
-                ("STD", "40S"): {"ID": 25.25, "Wall": 0.375},
-                ("XS", "80S"): {"ID": 25.0, "Wall": 0.5}
-            }
-        },
-        "28": {
-            "OD": 28.0,
-            "schedules": {
-                ("10",): {"ID": 27.376, "Wall": 0.312},
-                ("STD", "40S"): {"ID": 27.25, "Wall": 0.375},
-                ("XS", "20", "80S"): {"ID": 27.0, "Wall": 0.5},
-                ("30",): {"ID": 26.75, "Wall": 0.625}
-            }
-        },
-        "30": {
-            "OD": 30.0,
-            "schedules": {
-                ("10", "10S"): {"ID": 29.376, "Wall": 0.312},
-                ("STD", "40S"): {"ID": 29.25, "Wall": 0.375},
-                ("20", "XS", "80S"): {"ID": 29.0, "Wall": 0.5},
-                ("30",): {"ID": 28.75, "Wall": 0.625}
-            }
-        },
-        "32": {
-            "OD": 32.0,
-            "schedules": {
-                ("10",): {"ID": 31.376, "Wall": 0.312},
-                ("20",): {"ID": 31.25, "Wall": 0.375},
-                ("STD",): {"ID": 31.0, "Wall": 0.5}, 
-                ("30",): {"ID": 30.75, "Wall": 0.625},
-                ("40",): {"ID": 30.624, "Wall": 0.688}
-            }
-        },
-        "34": {
-            "OD": 34.0,
-            "schedules": {
-                ("10",): {"ID": 33.376, "Wall": 0.312},
-                ("STD",): {"ID": 33.25, "Wall": 0.375},
-                ("20",): {"ID": 33.0, "Wall": 0.5},
-                ("30",): {"ID": 32.75, "Wall": 0.625},
-                ("40",): {"ID": 32.624, "Wall": 0.688}
-            }
-        },
-        "36": {
-            "OD": 36.0,
-            "schedules": {
-                ("10",): {"ID": 35.376, "Wall": 0.312},
-                ("STD", "40S"): {"ID": 35.25, "Wall": 0.375},
-                ("XS", "80S"): {"ID": 35.0, "Wall": 0.5},
-                ("30",): {"ID": 34.75, "Wall": 0.625}
-            }
-        },
-        "42": {
-            "OD": 42.0,
-            "schedules": {
-                ("STD", "40S"): {"ID": 41.25, "Wall": 0.375},
-                ("XS", "80S"): {"ID": 41.0, "Wall": 0.5},
-                ("30",): {"ID": 40.75, "Wall": 0.625},
-                ("40",): {"ID": 40.5, "Wall": 0.75}
-            }
-        },
-        "48": {
-            "OD": 48.0,
-            "schedules": {
-                ("STD", "40S"): {"ID": 47.25, "Wall": 0.375},
-                ("XS", "80S"): {"ID": 47.0, "Wall": 0.5}
-            }
-        },
-        "54": {
-            "OD": 54.0,
-            "schedules": {
-                ("STD",): {"ID": 53.25, "Wall": 0.375},
-                ("XH",): {"ID": 53.0, "Wall": 0.5}
-            }
-        },
-        "60": {
-            "OD": 60.0,
-            "schedules": {
-                ("STD",): {"ID": 59.25, "Wall": 0.375},
-                ("XH",): {"ID": 59.0, "Wall": 0.5}
+
+class _ShardLines:
+    """
+    The decoded lines of one byte range of a file, read up to a record boundary.
+
+    Lines are read until the end offset is reached and, for CSV, on past it
+    until the record being parsed is complete, so a quoted field with an
+    embedded newline is never cut in two. record_end is the offset just
+    after the last complete record, where the next shard really starts.
+    """
+
+    def __init__(self, path, start, end, multiline=True):
+        self.path = path
+        self.end = end
+        self.multiline = multiline
+        self.position = start
+        self.record_end = start
+
+    def __iter__(self):
+        with open(self.path, "rb") as line_list:
+            line_list.seek(self.position)
+            while self.position < self.end or self.position != self.record_end:
+                line = line_list.readline()
+                if not line:
+                    break
+                self.position += len(line)
+                if not self.multiline:
+                    self.record_end = self.position
+                yield line.decode("utf-8")
+
+    def csv_rows(self, fieldnames):
+        """Yields one dictionary per CSV record, filled in like csv.DictReader does."""
+        for values in csv.reader(self):
+            # Blank lines are records too; they just produce no row
+            self.record_end = self.position
+            if values:
+                row = dict(zip(fieldnames, values))
+                if len(values) > len(fieldnames):
+                    row[None] = values[len(fieldnames):]
+                else:
+                    row.update(dict.fromkeys(fieldnames[len(values):]))
+                yield row
+
+
+def _read_shard_rows(lines, file_format, fieldnames):
+    """Yields the line list rows of one shard, like read_line_list() does for a whole file."""
+    if file_format == "csv":
+        return _read_csv_rows(lines.csv_rows(fieldnames))
+    return read_line_list(lines, file_format)
+
+
+def _annotate_shard(task):
+    """
+    Worker: annotates one shard into temporary output and reject files.
+
+    When the parent collects lookup statistics, the shard's lookups are
+    counted in a fresh LookupStats, which is returned for the parent to merge.
+
+    Returns:
+        tuple: (offset where the next shard starts, (output path, reject path,
+               rows written, rows rejected, statistics or None))
+    """
+    global _lookup_stats
+    path, start, end, file_format, fieldnames, temporary_directory, collect_stats, options = task
+    # Named after the end offset, which stays the same when the shard is redone
+    output_path = os.path.join(temporary_directory, f"{end}.out")
+    reject_path = os.path.join(temporary_directory, f"{end}.rej")
+    lines = _ShardLines(path, start, end, file_format == "csv")
+    # A shard redone in the parent must not replace the parent's statistics
+    previous_stats = _lookup_stats
+    stats = _lookup_stats = LookupStats() if collect_stats else None
+    try:
+        with open(output_path, "w", newline="", encoding="utf-8") as output_stream, \
+                open(reject_path, "w", newline="", encoding="utf-8") as reject_stream:
+            written, rejected = _write_annotated_rows(
+                _read_shard_rows(lines, file_format, fieldnames),
+                output_stream, reject_stream, fieldnames, False, **options
+            )
+    finally:
+        _lookup_stats = previous_stats
+    return lines.record_end, (output_path, reject_path, written, rejected, stats)
+
+
+def _take_off_shard(task):
+    """Worker: counts segments and sums lengths for one shard, returned after the next shard's start."""
+    path, start, end, file_format, fieldnames, dataset, options = task
+    lines = _ShardLines(path, start, end, file_format == "csv")
+    result = _accumulate_take_off(
+        _read_shard_rows(lines, file_format, fieldnames), _get_table_arrays(dataset), **options
+    )
+    return lines.record_end, result
+
+
+def _ordered_shard_results(pool, function, tasks):
+    """
+    Yields the results of function over the shard tasks, in order.
+
+    Shards are split at line starts, which may fall inside a quoted CSV field.
+    A shard is only valid if it starts where the previous one's last record
+    ended; otherwise it is redone in this process from that offset, and the
+    speculative result is discarded. Tasks are tuples of (path, start, ...).
+    """
+    expected_start = None
+    for task, (next_start, result) in zip(tasks, pool.imap(function, tasks)):
+        if expected_start is not None and task[1] != expected_start:
+            next_start, result = function((task[0], expected_start) + task[2:])
+        expected_start = next_start
+        yield result
+
+
+def _process_pool(workers):
+    """
+    Creates a process pool whose workers share the parent's tables.
+
+    Where available the workers are forked, so they inherit the already
+    built tables and indexes instead of receiving a pickled copy per task.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork").Pool(workers)
+    return multiprocessing.Pool(workers)
+
+
+def _plan_shards(path, file_format, workers):
+    """Returns the CSV field names (None for JSONL) and the byte ranges to process."""
+    fieldnames, start = _csv_header(path) if file_format == "csv" else (None, 0)
+    return fieldnames, shard_line_list(path, workers * SHARDS_PER_WORKER, start)
+
+
+def parallel_stream_line_list(path, output_stream, reject_stream, file_format="csv",
+                              size_column="size", schedule_column="schedule", chunk_size=10000,
+                              dataset=None, units="in", workers=None):
+    """
+    Annotates a line list file like stream_line_list(), using several processes.
+
+    The file is split into shards at record boundaries. Each worker annotates
+    its shards into temporary files. Each file is copied to the output and
+    deleted as soon as its shard and all earlier ones are done, so the output
+    is identical to the serial one. When lookup statistics are enabled, the
+    workers' statistics are merged into them.
+
+    Args:
+        path (str): The CSV or JSONL line list (a file, not stdin).
+        workers (int, optional): The number of processes. Defaults to the CPU count.
+        The other arguments are as for stream_line_list().
+
+    Returns:
+        tuple: (number of rows written, number of rows rejected)
+    """
+    workers = workers or os.cpu_count() or 1
+    fieldnames, shards = _plan_shards(path, file_format, workers)
+    # Build the lookup tables before forking so the workers inherit them
+    if np is not None:
+        _get_table_arrays(dataset)
+    options = {"size_column": size_column, "schedule_column": schedule_column,
+               "chunk_size": chunk_size, "dataset": dataset, "units": units}
+
+    stats = _lookup_stats
+    written = rejected = 0
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        tasks = [(path, start, end, file_format, fieldnames, temporary_directory, stats is not None, options)
+                 for start, end in shards]
+        with _process_pool(workers) as pool:
+            # The shards arrive in order as they finish
+            for output_path, reject_path, shard_written, shard_rejected, shard_stats in _ordered_shard_results(
+                    pool, _annotate_shard, tasks):
+                if stats is not None:
+                    stats.merge(shard_stats)
+                # Like the serial run, write the headers only once there is a row
+                if fieldnames is not None and written + rejected == 0 and shard_written + shard_rejected:
+                    csv.DictWriter(output_stream, fieldnames + list(DIMENSION_COLUMNS)).writeheader()
+                    csv.DictWriter(reject_stream, fieldnames).writeheader()
+                written += shard_written
+                rejected += shard_rejected
+                for shard_path, stream in ((output_path, output_stream), (reject_path, reject_stream)):
+                    with open(shard_path, newline="", encoding="utf-8") as shard_file:
+                        shutil.copyfileobj(shard_file, stream)
+                    os.remove(shard_path)
+
+    return written, rejected
+
+
+def parallel_aggregate_take_off(path, file_format="csv", size_column="size", schedule_column="schedule",
+                                length_column="length", material_column="material", chunk_size=10000,
+                                dataset=None, workers=None):
+    """
+    Sums take-off quantities like aggregate_take_off(), using several processes.
+
+    Each worker returns the segment counts and exact length sums of its
+    shards, and these integer arrays are added together, so the result is
+    identical to the serial one.
+
+    Args:
+        path (str): The CSV or JSONL line list (a file, not stdin).
+        workers (int, optional): The number of processes. Defaults to the CPU count.
+        The other arguments are as for aggregate_take_off().
+
+    Returns:
+        dict: The same result as aggregate_take_off().
+    """
+    workers = workers or os.cpu_count() or 1
+    fieldnames, shards = _plan_shards(path, file_format, workers)
+    tables = _get_table_arrays(dataset)
+    options = {"size_column": size_column, "schedule_column": schedule_column,
+               "length_column": length_column, "material_column": material_column,
+               "chunk_size": chunk_size}
+
+    _, _, group_count = _take_off_group_counts(tables)
+    counts = np.zeros(group_count, dtype=np.int64)
+    length_units = np.zeros(group_count, dtype=np.int64)
+    rejected = 0
+    tasks = [(path, start, end, file_format, fieldnames, dataset, options) for start, end in shards]
+    with _process_pool(workers) as pool:
+        for shard_counts, shard_length_units, shard_rejected in _ordered_shard_results(
+                pool, _take_off_shard, tasks):
+            counts += shard_counts
+            length_units += shard_length_units
+            rejected += shard_rejected
+
+    return _summarize_take_off(counts, length_units, rejected, tables)
+
+
+# --- HTTP lookup service ---
+
+SERVICE_CACHE_SIZE = 4096
+MAX_REQUEST_BODY = 16 * 1024 * 1024
+HTTP_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+    500: "Internal Server Error"
+}
+
+
+def _json_bytes(value):
+    """Encodes a value as compact UTF-8 JSON."""
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _lookup_columns(pipe_sizes, schedules, dataset=None, units="in"):
+    """
+    Looks up many pipes and returns the results as JSON-ready columns.
+
+    Returns:
+        dict: 'OD', 'ID', and 'Wall Thickness' lists (None where not found) and a 'found' list.
+    """
+    if np is None:
+        records = [
+            lookup_pipe(pipe_size, schedule, dataset, None, units)
+            for pipe_size, schedule in zip(pipe_sizes, schedules)
+        ]
+        columns = {
+            column: [None if record is None else record[field] for record in records]
+            for field, column in enumerate(DIMENSION_COLUMNS)
         }
+        columns["found"] = [record is not None for record in records]
+        return columns
+
+    result = _lookup_batch(np.asarray(pipe_sizes, dtype=str), np.asarray(schedules, dtype=str),
+                           dataset, "batch", units)
+    found = result["found"]
+    columns = {
+        column: np.where(found, result[column], None).tolist() for column in DIMENSION_COLUMNS
     }
-}
+    columns["found"] = found.tolist()
+    return columns
 
-    # Check if the normalized pipe size exists in the data
-    if normalized_pipe_size in pipe_data:
-        pipe_size_info = pipe_data[normalized_pipe_size]
-        od = pipe_size_info["OD"]
-        schedules_for_size = pipe_size_info["schedules"]
-
-        # Iterate through the schedules for the given pipe size to find a match
-        for schedule_keys, dimensions in schedules_for_size.items():
-            if normalized_schedule in schedule_keys:
-                return {
-                    "OD": od,
-                    "ID": dimensions["ID"],
-                    "Wall Thickness": dimensions["Wall"]
-                }
-    
-    # If no match is found after checking all entries
-    return f"No data found for Pipe Size: '{pipe_size_input}' and Schedule: '{schedule_input}'."
 
-# --- Main execution block for user interaction ---
-if __name__ == "__main__":
+@lru_cache(maxsize=SERVICE_CACHE_SIZE)
+def _pipe_body(pipe_size, schedule, record, units):
+    """
+    Returns the JSON body for a found pipe.
+
+    Cached by the canonical size and schedule and the record itself, so
+    repeated queries skip the JSON encoding, and a replaced dataset can
+    never be answered from a stale entry.
+    """
+    return _json_bytes({
+        "Pipe Size": pipe_size,
+        "Schedule": schedule,
+        "OD": record.od,
+        "ID": record.id,
+        "Wall Thickness": record.wall,
+        "units": units
+    })
+
+
+def _pipe_response(pipe_size, schedule, dataset, units):
+    """
+    Returns the (status, JSON body) of a single lookup.
+
+    The lookup itself always runs, so every request is counted by the lookup
+    statistics; only the encoding of the response is cached.
+    """
+    try:
+        record = lookup_pipe(pipe_size, schedule, dataset, units=units)
+    except PipeNotFoundError as error:
+        return 404, _json_bytes({"error": str(error)})
+    except ValueError as error:
+        return 400, _json_bytes({"error": str(error)})
+    return 200, _pipe_body(canonical_pipe_size(pipe_size), canonical_schedule(schedule), record, units)
+
+
+def _decode_request(body):
+    """Parses a JSON request body; returns None unless it is a JSON object."""
+    try:
+        request = json.loads(body)
+    except ValueError:
+        return None
+    return request if isinstance(request, dict) else None
+
+
+def _batch_response(request, dataset, units):
+    """Returns the (status, JSON body) of a batch lookup request {"size": [...], "schedule": [...]}."""
+    pipe_sizes, schedules = request.get("size"), request.get("schedule")
+    dataset, units = request.get("dataset", dataset), request.get("units", units)
+    if not isinstance(pipe_sizes, list) or not isinstance(schedules, list) or len(pipe_sizes) != len(schedules):
+        return 400, _json_bytes({"error": '"size" and "schedule" must be arrays of the same length.'})
+    try:
+        columns = _lookup_columns([str(value) for value in pipe_sizes], [str(value) for value in schedules],
+                                  dataset, units)
+    except (ValueError, TypeError) as error:
+        return 400, _json_bytes({"error": str(error)})
+    columns["units"] = units
+    return 200, _json_bytes(columns)
+
+
+def _route_request(method, target, body, dataset, units):
+    """Dispatches one HTTP request to the lookup endpoints and returns (status, JSON body)."""
+    path, _, query = target.partition("?")
+    if path == "/pipe":
+        if method != "GET":
+            return 405, _json_bytes({"error": "Use GET for /pipe."})
+        parameters = {name: values[-1] for name, values in parse_qs(query).items()}
+        if "size" not in parameters or "schedule" not in parameters:
+            return 400, _json_bytes({"error": "Give the size and schedule query parameters."})
+        return _pipe_response(parameters["size"], parameters["schedule"],
+                              parameters.get("dataset", dataset), parameters.get("units", units))
+    if path == "/batch":
+        if method != "POST":
+            return 405, _json_bytes({"error": "Use POST for /batch."})
+        request = _decode_request(body)
+        if request is None:
+            return 400, _json_bytes({"error": 'Send a JSON object with "size" and "schedule" arrays.'})
+        return _batch_response(request, dataset, units)
+    return 404, _json_bytes({"error": f"Unknown path: '{path}'. Use /pipe or /batch."})
+
+
+def _http_response(status, body, keep_alive):
+    """Builds the bytes of an HTTP/1.1 JSON response."""
+    head = (
+        f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _serve_connection(reader, writer, dataset=None, units="in"):
+    """Answers the requests of one client connection until it closes or asks to."""
+    import asyncio
+
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+            except asyncio.LimitOverrunError:
+                writer.write(_http_response(400, _json_bytes({"error": "Request header too large."}), False))
+                break
+
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                method, target, version = request_line.split(" ")
+                length = int(headers.get("content-length", 0))
+            except ValueError:
+                writer.write(_http_response(400, _json_bytes({"error": "Malformed request."}), False))
+                break
+            if length < 0:
+                writer.write(_http_response(400, _json_bytes({"error": "Malformed request."}), False))
+                break
+            if length > MAX_REQUEST_BODY:
+                writer.write(_http_response(413, _json_bytes({"error": "Request body too large."}), False))
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            # HTTP/1.1 connections stay open unless the client says otherwise; HTTP/1.0 ones must ask
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+            try:
+                status, response_body = _route_request(method, target, body, dataset, units)
+            except Exception as error:
+                # Answer rather than drop the client, then close in case the failure left bad state
+                print(f"Error answering {method} {target}: {error!r}", file=sys.stderr)
+                status, response_body, keep_alive = 500, _json_bytes({"error": "Internal server error."}), False
+            writer.write(_http_response(status, response_body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_lookups(host="127.0.0.1", port=8080, dataset=None, units="in"):
+    """
+    Serves pipe lookups over HTTP until cancelled.
+
+    Endpoints:
+        GET /pipe?size=2%201/2&schedule=40[&units=mm][&dataset=...]
+            One pipe, as {"Pipe Size", "Schedule", "OD", "ID", "Wall Thickness", "units"},
+            or 404 with {"error"} when there is no data.
+        POST /batch with {"size": [...], "schedule": [...]} (optionally "units" and "dataset")
+            Many pipes, as columns: {"OD": [...], "ID": [...], "Wall Thickness": [...],
+            "found": [...], "units"}, with null where a pipe was not found.
+
+    Connections are kept alive between requests, and the JSON bodies of found
+    pipes are cached, so a repeated query skips the encoding. Every lookup is
+    still counted by the lookup statistics.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        dataset (str, optional): The dataset used when a request does not name one.
+        units (str): The units used when a request does not give them.
+    """
+    import asyncio
+
+    server = await asyncio.start_server(
+        lambda reader, writer: _serve_connection(reader, writer, dataset, units), host, port
+    )
+    async with server:
+        await server.serve_forever()
+
+
+# --- Co-process mode over stdin/stdout ---
+
+def _coprocess_response(line, dataset=None, units="in"):
+    """Answers one request line with the JSON body a service request would get."""
+    request = _decode_request(line)
+    if request is None or "size" not in request or "schedule" not in request:
+        return _json_bytes({"error": 'Send one JSON object with "size" and "schedule" per line.'})
+    if isinstance(request["size"], list):
+        return _batch_response(request, dataset, units)[1]
+    try:
+        return _pipe_response(str(request["size"]), str(request["schedule"]),
+                              request.get("dataset", dataset), request.get("units", units))[1]
+    except TypeError as error:
+        return _json_bytes({"error": str(error)})
+
+
+def serve_stdio(input_stream=None, output_stream=None, dataset=None, units="in"):
+    """
+    Answers newline-delimited JSON requests until the input ends.
+
+    Meant to be started once and kept running by another program (a spreadsheet
+    macro or a shell script), which then pays the interpreter start-up only
+    once. Each line is one request, answered by exactly one line, in order:
+        {"size": "2 1/2", "schedule": "40"}
+            -> {"Pipe Size": "2 1/2", "Schedule": "40", "OD": ..., "ID": ..., "Wall Thickness": ..., "units": "in"}
+        {"size": ["2", "3"], "schedule": ["40", "XS"], "units": "mm"}
+            -> {"OD": [...], "ID": [...], "Wall Thickness": [...], "found": [...], "units": "mm"}
+    Requests may also give a "dataset". A pipe with no data, or a bad
+    request, is answered with {"error": ...}. Blank lines are ignored.
+
+    Args:
+        input_stream (binary file, optional): Where requests are read (default: stdin).
+        output_stream (binary file, optional): Where responses are written,
+                                               flushed after each one (default: stdout).
+        dataset (str, optional): The dataset used when a request does not name one.
+        units (str): The units used when a request does not give them.
+
+    Returns:
+        int: The number of requests answered.
+    """
+    input_stream = input_stream or sys.stdin.buffer
+    output_stream = output_stream or sys.stdout.buffer
+    answered = 0
+    for line in input_stream:
+        if not line.strip():
+            continue
+        output_stream.write(_coprocess_response(line, dataset, units) + b"\n")
+        output_stream.flush()
+        answered += 1
+    return answered
+
+
+# --- Command line interface ---
+
+def _open_stream(path, mode):
+    """Opens a file for text streaming, treating '-' as stdin or stdout."""
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def _write_lookup_stats(path):
+    """Writes the lookup statistics to a file: Prometheus text if it ends in .prom, otherwise JSON."""
+    output_format = "prometheus" if path.endswith(".prom") else "json"
+    with open(path, "w", encoding="utf-8") as stats_file:
+        stats_file.write(dump_lookup_stats(output_format))
+
+
+def run_take_off(args):
+    """Sums the take-off of a line list and writes one CSV row per size/schedule/material."""
+    file_format = _detect_format(args.input, args.format)
+    if args.workers > 1 and args.input != "-":
+        take_off = parallel_aggregate_take_off(
+            args.input, file_format, args.size_column, args.schedule_column, args.length_column,
+            args.material_column, args.chunk_size, args.dataset, args.workers
+        )
+    else:
+        input_stream = _open_stream(args.input, "r")
+        try:
+            take_off = aggregate_take_off(
+                read_line_list(input_stream, file_format), args.size_column, args.schedule_column,
+                args.length_column, args.material_column, args.chunk_size, args.dataset
+            )
+        finally:
+            if input_stream is not sys.stdin:
+                input_stream.close()
+
+    writer = csv.DictWriter(sys.stdout, ("Pipe Size", "Schedule", "Material") + TAKE_OFF_TOTALS)
+    writer.writeheader()
+    writer.writerows(take_off["groups"])
+    print(f"Summed {take_off['totals']['Segments']} segments, rejected {take_off['rejected']} rows.",
+          file=sys.stderr)
+    return 0
+
+
+def run_bulk_lookup(args):
+    """Runs the non-interactive bulk lookup described by the parsed command line arguments."""
+    if args.take_off:
+        return run_take_off(args)
+    file_format = _detect_format(args.input, args.format)
+    if args.stats:
+        enable_lookup_stats()
+    options = (args.size_column, args.schedule_column, args.chunk_size, args.dataset, args.units)
+    reject_stream = _open_stream(args.rejects, "w") if args.rejects else sys.stderr
+    try:
+        if args.workers > 1 and args.input != "-":
+            written, rejected = parallel_stream_line_list(
+                args.input, sys.stdout, reject_stream, file_format, *options, workers=args.workers
+            )
+        else:
+            input_stream = _open_stream(args.input, "r")
+            try:
+                written, rejected = stream_line_list(
+                    input_stream, sys.stdout, reject_stream, file_format, *options
+                )
+            finally:
+                if input_stream is not sys.stdin:
+                    input_stream.close()
+    finally:
+        if reject_stream not in (sys.stdout, sys.stderr):
+            reject_stream.close()
+
+    print(f"Annotated {written} rows, rejected {rejected} rows.", file=sys.stderr)
+    if args.stats:
+        _write_lookup_stats(args.stats)
+    return 0
+
+
+def run_service(args):
+    """Runs the HTTP lookup service described by the parsed command line arguments."""
+    # asyncio is imported only here, so the other modes do not pay for it at start up
+    import asyncio
+
+    if args.stats:
+        enable_lookup_stats()
+    print(f"Serving pipe lookups on http://{args.host}:{args.serve}/ (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        asyncio.run(serve_lookups(args.host, args.serve, args.dataset, args.units))
+    except KeyboardInterrupt:
+        pass
+    if args.stats:
+        _write_lookup_stats(args.stats)
+    return 0
+
+
+def run_coprocess(args):
+    """Runs the stdin/stdout co-process mode described by the parsed command line arguments."""
+    if args.stats:
+        enable_lookup_stats()
+    serve_stdio(dataset=args.dataset, units=args.units)
+    if args.stats:
+        _write_lookup_stats(args.stats)
+    return 0
+
+
+def run_interactive():
+    """Asks for pipe sizes and schedules one at a time and prints their dimensions."""
     print("Welcome to the Pipe Dimension Calculator!")
     print("Enter the nominal pipe size and schedule to get its OD, ID, and Wall Thickness.")
     print("Example Pipe Sizes: 1/2, 2, 3 1/2, 10, 1/8\"")
@@ -510,3 +3288,67 @@ if __name__ == "__main__":
             print(f"An unexpected error occurred: {e}. Please try again.")
 
     print("Thank you for using the Pipe Dimension Calculator!")
+
+
+def _parse_args(argv=None):
+    """Parses the command line arguments for the bulk lookup mode."""
+    parser = argparse.ArgumentParser(
+        description="Look up pipe OD, ID, and Wall Thickness by nominal size and schedule. "
+                    "Runs interactively unless --input, --serve, or --coprocess is given."
+    )
+    parser.add_argument("-i", "--input",
+                        help="CSV or JSONL line list to annotate ('-' reads from stdin).")
+    parser.add_argument("--format", choices=("csv", "jsonl"),
+                        help="Line list format (default: from the file extension, otherwise csv).")
+    parser.add_argument("--rejects",
+                        help="File for rows with no matching data (default: stderr).")
+    parser.add_argument("--size-column", default="size",
+                        help="Column holding the nominal pipe size (default: size).")
+    parser.add_argument("--schedule-column", default="schedule",
+                        help="Column holding the schedule (default: schedule).")
+    parser.add_argument("--take-off", action="store_true",
+                        help="Sum weight, internal volume, and surface area by size, schedule, "
+                             "and material instead of annotating each row.")
+    parser.add_argument("--length-column", default="length",
+                        help="Column holding the segment length in ft, for --take-off (default: length).")
+    parser.add_argument("--material-column", default="material",
+                        help=f"Column holding the material, for --take-off (default: material; "
+                             f"rows without one count as {DEFAULT_MATERIAL}).")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="Number of rows looked up together (default: 10000).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes for a file --input, split into shards at "
+                             "line boundaries (default: 1, no parallelism).")
+    parser.add_argument("--dataset", choices=list_datasets(),
+                        help=f"Dimension dataset to use (default: {DEFAULT_DATASET}).")
+    parser.add_argument("--units", choices=UNITS, default="in",
+                        help="Units of the OD, ID, and Wall Thickness columns (default: in).")
+    parser.add_argument("--stats", metavar="PATH",
+                        help="Write lookup statistics to this file after the run "
+                             "(Prometheus text if it ends in .prom, otherwise JSON).")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="Serve lookups over HTTP on this port (see serve_lookups()).")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Address for --serve to listen on (default: 127.0.0.1).")
+    parser.add_argument("--coprocess", action="store_true",
+                        help="Answer newline-delimited JSON requests from stdin with one JSON "
+                             "line each on stdout, without prompts (see serve_stdio()).")
+    parser.add_argument("--export-table", metavar="PATH",
+                        help="Write the pipe table to a binary file for load_pipe_table() and exit.")
+    return parser.parse_args(argv)
+
+
+# --- Main execution block for user interaction ---
+if __name__ == "__main__":
+    arguments = _parse_args()
+    if arguments.export_table is not None:
+        row_count = export_pipe_table(arguments.export_table)
+        print(f"Wrote {row_count} rows to {arguments.export_table}.")
+        sys.exit(0)
+    if arguments.coprocess:
+        sys.exit(run_coprocess(arguments))
+    if arguments.serve is not None:
+        sys.exit(run_service(arguments))
+    if arguments.input is not None:
+        sys.exit(run_bulk_lookup(arguments))
+    run_interactive()